@@ -1,17 +1,8 @@
 import os
-from flask import Flask
-from src.api.routes import api
+from src.app import create_app
 
-def create_app():
-    """Create and configure the Flask application"""
-    app = Flask(__name__)
-    
-    # Register blueprints
-    app.register_blueprint(api, url_prefix='/api')
-    
-    return app
-
-# Create the app instance at module level for Gunicorn
+# Create the app instance at module level for Gunicorn; src/app.py builds
+# it, so the deployed app and `python -m src.app` are configured alike
 app = create_app()
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60.0
+
+
+def request_key(parsed_inputs: Tuple) -> str:
+    """
+    Canonical hash of parsed optimize inputs (UserDataParser.parse_user_input)
+
+    Key order is kept, not sorted: holdings order decides ties in the sale
+    order and the order of the response, so reordered inputs are distinct.
+    """
+    canonical = json.dumps(parsed_inputs, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of serialized responses with a time-to-live
+
+    Entries are keyed by (snapshot version, scoring version, request), so a
+    snapshot swap never serves stale plans. A request still pinned to the
+    previous snapshot during a swap neither sees nor drops the new entries;
+    entries of replaced versions are never hit again and leave through the
+    TTL or LRU eviction. Thread-safe; hits return the stored bytes as is.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Tuple[str, str, str], Tuple[float, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'misses', 'evictions', 'expirations'), 0)
+
+    def get(self, versions: Tuple[str, str], key: str) -> Optional[bytes]:
+        """Cached body for a request under the given versions, or None"""
+        key = (*versions, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            expires_at, body = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return body
+
+    def put(self, versions: Tuple[str, str], key: str, body: bytes):
+        key = (*versions, key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), max_entries=self.max_entries)
@@ -1,9 +1,28 @@
-from flask import Blueprint, request, jsonify
+import io
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from ..engine.liquidity_engine import SmartLiquidityEngine
+from .cache import request_key
+from ..utils.parser import UserDataParser
 
 # Create blueprint
 api = Blueprint('api', __name__)
 
+# Most amounts one what-if request may evaluate
+MAX_WHAT_IF_AMOUNTS = 1000
+
+# Most households one batch request may carry
+MAX_BATCH_ITEMS = 10000
+
+# Households a streaming request keeps in flight per batch worker
+STREAM_PREFETCH_PER_WORKER = 2
+
+# How often a blocked stream reader checks whether the response was closed
+STREAM_POLL_INTERVAL = 0.1
+
 @api.route('/optimize-liquidation', methods=['POST'])
 def optimize_liquidation_api():
     """
@@ -23,6 +42,15 @@ def optimize_liquidation_api():
             },
             "bank_balances": {
                 "member": amount
+            },
+            "holdings_unit": "value|quantity",
+            "holding_details": {
+                "member": {
+                    "asset_name": {"cost_basis": rupees, "months_held": int}
+                }
+            },
+            "ltcg_exemption_used": {
+                "member": rupees
             }
         },
         "questionnaire": {
@@ -30,9 +58,12 @@ def optimize_liquidation_api():
             "timeline": "today|2-3_days|within_week|1-4_weeks|no_timeline",
             "amount_needed": float,
             "recurring_need": "one_time|recurring",
+            "recurring_periods": int,
             "has_goals": "yes|no",
             "income_change": "no_change|will_reduce|will_increase",
-            "priority_members": ["member_ids"]
+            "priority_members": ["member_ids"],
+            "solver": "greedy|exact",
+            "tax_aware": true|false|"yes"|"no"
         }
     }
     """
@@ -46,14 +77,325 @@ def optimize_liquidation_api():
                 'message': 'No JSON data provided'
             }), 400
             
-        # Create engine instance and process input
-        engine = SmartLiquidityEngine()
-        result = engine.process_user_input(data)
+        try:
+            parsed = UserDataParser.parse_user_input(data)
+        except ValueError as e:
+            return jsonify({
+                'status': 'PARSING_ERROR',
+                'message': f'Error parsing input data: {str(e)}'
+            }), 400
+        except Exception:
+            parsed = None  # process_user_input reports the parsing error
+            
+        # Pin the current screener snapshot for the whole request so a
+        # concurrent reload cannot change data mid-computation
+        snapshot = current_app.extensions['screener_snapshots'].current
         
-        return jsonify(result)
+        # Identical resubmissions against the same snapshot and rules are
+        # served from the response cache
+        cache = current_app.extensions.get('response_cache')
+        flights = current_app.extensions.get('single_flight')
+        versions = (snapshot.version, snapshot.scoring.version)
+        key = None
+        if parsed is not None and (cache is not None or flights is not None):
+            key = request_key(parsed)
+        if key is not None and cache is not None:
+            body = cache.get(versions, key)
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
         
+        def compute() -> bytes:
+            engine = SmartLiquidityEngine(snapshot, coalescer=current_app.extensions.get('score_coalescer'))
+            result = engine.process_user_input(data)
+            result['snapshot_version'] = snapshot.version
+            result['scoring_version'] = snapshot.scoring.version
+            return jsonify(result).get_data()
+        
+        if key is not None and flights is not None:
+            # Identical requests already in flight wait for that computation
+            body = flights.do(f'{versions[0]}:{versions[1]}:{key}', compute)
+        else:
+            body = compute()
+        if key is not None and cache is not None:
+            cache.put(versions, key, body)
+        return current_app.response_class(body, mimetype='application/json')
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'ERROR',
+            'message': f'Error processing request: {str(e)}'
+        }), 500
+
+@api.route('/cache/stats', methods=['GET'])
+def cache_stats_api():
+    """Hit/miss counters of the optimize-liquidation response cache and request deduplication"""
+    cache = current_app.extensions.get('response_cache')
+    stats = dict(cache.stats(), enabled=True) if cache is not None else {'enabled': False}
+    flights = current_app.extensions.get('single_flight')
+    if flights is not None:
+        stats['single_flight'] = flights.stats()
+    return jsonify(stats)
+
+@api.route('/optimize-liquidation/batch', methods=['POST'])
+def optimize_liquidation_batch_api():
+    """
+    API endpoint for optimizing many households in one call
+    Expected JSON input format:
+    {
+        "households": [{"portfolio": {...}, "questionnaire": {...}}, ...]
+    }
+    Each item is an optimize-liquidation body. Results come back in input
+    order; a failing item gets an ERROR result instead of failing the batch.
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'ERROR',
+                'message': 'No JSON data provided'
+            }), 400
+
+        households = data.get('households')
+        if not isinstance(households, list) or len(households) > MAX_BATCH_ITEMS:
+            return jsonify({
+                'status': 'ERROR',
+                'message': f"'households' must be a list of at most {MAX_BATCH_ITEMS} payloads"
+            }), 400
+
+        # Every item is computed against the same pinned snapshot
+        snapshot = current_app.extensions['screener_snapshots'].current
+        executor = current_app.extensions['batch_executor']
+        results = list(executor.map(lambda household: _optimize_household(snapshot, household), households))
+
+        return jsonify({
+            'results': results,
+            'snapshot_version': snapshot.version,
+            'scoring_version': snapshot.scoring.version
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'ERROR',
+            'message': f'Error processing request: {str(e)}'
+        }), 500
+
+
+@api.route('/optimize-liquidation/stream', methods=['POST'])
+def optimize_liquidation_stream_api():
+    """
+    API endpoint for optimizing households streamed as newline-delimited JSON
+    Expected input: one optimize-liquidation body per line (application/x-ndjson)
+    Output: one result line per household, in input order, written as soon
+    as it is computed. Only a few households are in flight at a time, so
+    memory stays flat however long the stream is.
+    """
+    snapshot = current_app.extensions['screener_snapshots'].current
+    executor = current_app.extensions['batch_executor']
+    window = STREAM_PREFETCH_PER_WORKER * current_app.config['BATCH_WORKERS']
+    stream = request.stream
+
+    def generate():
+        # A reader thread submits households as lines arrive; results are
+        # written as soon as the oldest one is done, never held back until
+        # the client sends another line
+        futures = queue.Queue(maxsize=window)
+        stop = threading.Event()
+        threading.Thread(target=_read_households, args=(stream, futures, stop, executor, snapshot),
+                         name='stream-reader', daemon=True).start()
+        try:
+            while True:
+                future = futures.get()
+                if future is None:
+                    break
+                yield _ndjson_line(future.result())
+        finally:
+            stop.set()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _read_households(stream, futures: queue.Queue, stop: threading.Event, executor, snapshot):
+    """Parse streamed request lines and submit them in order; None marks the end"""
+    try:
+        for line in _request_lines(stream):
+            if not line.strip():
+                continue
+            try:
+                household = json.loads(line)
+            except ValueError as e:
+                household = e
+            if not _put_unless_stopped(futures, executor.submit(_stream_result, snapshot, household), stop):
+                return
+    except Exception as e:
+        # Reading failed (e.g. the client disconnected): fail the response there
+        failed = Future()
+        failed.set_exception(e)
+        _put_unless_stopped(futures, failed, stop)
+        return
+    _put_unless_stopped(futures, None, stop)
+
+
+def _request_lines(stream):
+    """Lines of a request body as they arrive"""
+    if isinstance(stream, io.RawIOBase):
+        # Werkzeug's stream wrappers read lines a byte at a time; buffer them
+        stream = io.BufferedReader(stream)
+    return iter(stream.readline, b'')
+
+
+def _put_unless_stopped(futures: queue.Queue, item, stop: threading.Event) -> bool:
+    """Queue an item, waiting while the window is full; False once the response is closed"""
+    while not stop.is_set():
+        try:
+            futures.put(item, timeout=STREAM_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _stream_result(snapshot, household) -> dict:
+    """One streamed household's result, tagged with the snapshot it used"""
+    if isinstance(household, ValueError):
+        return {
+            'status': 'PARSING_ERROR',
+            'message': f'Invalid JSON line: {str(household)}'
+        }
+    result = _optimize_household(snapshot, household)
+    result['snapshot_version'] = snapshot.version
+    result['scoring_version'] = snapshot.scoring.version
+    return result
+
+
+def _ndjson_line(result: dict) -> str:
+    return current_app.json.dumps(result) + '\n'
+
+
+def _optimize_household(snapshot, household) -> dict:
+    """One batch item's result; errors are returned, not raised"""
+    if not isinstance(household, dict) or not household:
+        return {
+            'status': 'ERROR',
+            'message': 'Each household must be a JSON object with portfolio and questionnaire'
+        }
+    try:
+        return SmartLiquidityEngine(snapshot).process_user_input(household)
+    except Exception as e:
+        return {
+            'status': 'ERROR',
+            'message': f'Error processing request: {str(e)}'
+        }
+
+@api.route('/score', methods=['POST'])
+def score_instruments_api():
+    """
+    API endpoint for scoring instruments for sale priority without a liquidation
+    Expected JSON input format:
+    {
+        "stocks": ["stock_name", ...],
+        "mutual_funds": ["mf_name", ...],
+        "purpose": "emergency|planned_purchase|loan_repayment|other",
+        "timeline": "today|2-3_days|within_week|1-4_weeks|no_timeline"
+    }
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'ERROR',
+                'message': 'No JSON data provided'
+            }), 400
+
+        stock_names = data.get('stocks', [])
+        mf_names = data.get('mutual_funds', [])
+        if not isinstance(stock_names, list) or not isinstance(mf_names, list):
+            return jsonify({
+                'status': 'ERROR',
+                'message': "'stocks' and 'mutual_funds' must be lists of instrument names"
+            }), 400
+        try:
+            purpose, timeline = SmartLiquidityEngine.parse_purpose_timeline(data)
+        except ValueError as e:
+            return jsonify({
+                'status': 'ERROR',
+                'message': f'Invalid purpose: {str(e)}'
+            }), 400
+
+        snapshot = current_app.extensions['screener_snapshots'].current
+        engine = SmartLiquidityEngine(snapshot)
+        result = engine.score_instruments(stock_names, mf_names, purpose, timeline)
+        result['purpose'] = purpose.value
+        result['timeline'] = timeline.value
+        result['snapshot_version'] = snapshot.version
+        result['scoring_version'] = snapshot.scoring.version
+
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({
+            'status': 'ERROR',
+            'message': f'Error processing request: {str(e)}'
+        }), 500
+
+@api.route('/optimize-liquidation/what-if', methods=['POST'])
+def what_if_api():
+    """
+    API endpoint for liquidation plans at many amounts for one household
+    Expected JSON input format: the optimize-liquidation body plus
+    {
+        "amounts": [float, ...]  // replaces questionnaire.amount_needed
+    }
+    """
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'ERROR',
+                'message': 'No JSON data provided'
+            }), 400
+
+        amounts = data.get('amounts')
+        if (not isinstance(amounts, list) or not amounts or len(amounts) > MAX_WHAT_IF_AMOUNTS
+                or not all(isinstance(amount, (int, float)) and not isinstance(amount, bool) for amount in amounts)):
+            return jsonify({
+                'status': 'ERROR',
+                'message': f"'amounts' must be a list of 1 to {MAX_WHAT_IF_AMOUNTS} numbers"
+            }), 400
+
+        try:
+            mf_map, stock_map, bank_balances, question_answers = UserDataParser.parse_user_input(data)
+            SmartLiquidityEngine.parse_purpose_timeline(question_answers)
+        except ValueError as e:
+            return jsonify({
+                'status': 'PARSING_ERROR',
+                'message': f'Error parsing input data: {str(e)}'
+            }), 400
+
+        snapshot = current_app.extensions['screener_snapshots'].current
+        engine = SmartLiquidityEngine(snapshot)
+        frontier = engine.build_plan_frontier(mf_map, stock_map, bank_balances, question_answers)
+
+        return jsonify({
+            'frontier': [
+                {
+                    'member': asset['member'],
+                    'type': 'Stock' if asset['type'] == 'stock' else 'MF',
+                    'name': asset['asset_id'],
+                    'score': asset['score'],
+                    'estimated_value': asset['estimated_value']
+                }
+                for asset in frontier.assets
+            ],
+            'plans': frontier.plan_summaries(amounts),
+            'snapshot_version': snapshot.version,
+            'scoring_version': snapshot.scoring.version
+        })
+
     except Exception as e:
         return jsonify({
             'status': 'ERROR',
             'message': f'Error processing request: {str(e)}'
-        }), 500 
\ No newline at end of file
+        }), 500
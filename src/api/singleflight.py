@@ -0,0 +1,157 @@
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Longest a caller waits on another process's computation before running its own
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+# Shared results older than this are pruned from the lock store
+DEFAULT_RESULT_TTL = 60.0
+PRUNE_EVERY = 256  # leader writes between prunes
+
+_POLL_INTERVAL = 0.001
+
+
+class SingleFlight:
+    """
+    One computation per key at a time; concurrent identical callers share its result
+
+    Within a process, the first caller for a key computes and later callers
+    block on it and get the same bytes (or the same exception). With a
+    FileLockStore, callers in other worker processes on the box are
+    deduplicated too: they wait for the process holding the key's lock and
+    read the result it leaves in the store.
+    """
+
+    def __init__(self, store: Optional['FileLockStore'] = None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {'computed': 0, 'shared': 0}
+
+    def do(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats['shared'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.store.run(key, compute) if self.store is not None else compute()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._stats['computed'] += 1
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls), cross_process=self.store is not None)
+
+
+class _Call:
+    """A computation in flight and its outcome"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FileLockStore:
+    """
+    Local stand-in for a shared lock store: flock'd lock files plus result files
+
+    Every key maps to `<hash>.lock` and `<hash>.result` in one directory on
+    local disk. The process that takes the exclusive lock computes and
+    writes the result; the others wait for the lock to be released, then
+    read a result written after they started waiting. If none appears (the
+    computation failed) or the wait times out, they compute themselves.
+    """
+
+    def __init__(self, directory: str, wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 result_ttl: float = DEFAULT_RESULT_TTL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self._writes = 0
+
+    def run(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        path = os.path.join(self.directory, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest())
+        started = time.time()
+        with open(path + '.lock', 'a+b') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                body = self._wait_for_result(lock_file, path, started)
+                return body if body is not None else compute()
+            try:
+                body = compute()
+                self._write_result(path, body)
+                return body
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _wait_for_result(self, lock_file, path: str, started: float) -> Optional[bytes]:
+        """Wait for the computing process to release the key, then read its result"""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    return None
+                time.sleep(_POLL_INTERVAL)
+        try:
+            if os.stat(path + '.result').st_mtime < started:
+                return None  # left over from an earlier computation
+            with open(path + '.result', 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_result(self, path: str, body: bytes):
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(body)
+        os.replace(temporary, path + '.result')
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """Remove results and idle lock files older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime >= cutoff:
+                    continue
+                if name.endswith('.lock'):
+                    with open(path, 'a+b') as lock_file:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.unlink(path)
+                else:
+                    os.unlink(path)
+            except (BlockingIOError, FileNotFoundError):
+                continue
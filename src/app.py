@@ -1,11 +1,56 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask
+from src.api.cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, ResponseCache
 from src.api.routes import api
+from src.api.singleflight import FileLockStore, SingleFlight
+from src.engine.coalescer import DEFAULT_MAX_ITEMS, ScoreCoalescer
+from src.engine.snapshot import SnapshotHolder
 
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__)
     
+    # Parse the screener CSVs once per process; every request shares the
+    # current immutable snapshot, which a background thread swaps out when
+    # the CSVs change (SCREENER_RELOAD_INTERVAL seconds, 0 disables)
+    snapshots = SnapshotHolder()
+    snapshots.start(float(os.environ.get('SCREENER_RELOAD_INTERVAL', 60)))
+    app.extensions['screener_snapshots'] = snapshots
+    
+    # Worker pool shared by batch and streaming requests (BATCH_WORKERS
+    # threads). Per-household work is mostly Python and holds the GIL, so
+    # the pool does not scale with cores
+    app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', os.cpu_count() or 4))
+    app.extensions['batch_executor'] = ThreadPoolExecutor(
+        max_workers=app.config['BATCH_WORKERS'],
+        thread_name_prefix='batch'
+    )
+    
+    # Optional micro-batching of concurrent optimize requests: their holdings
+    # are scored and put in sale order in one pass (COALESCE_WINDOW_MS, 0
+    # disables; up to COALESCE_MAX_ITEMS requests). Batch and stream
+    # requests are not coalesced
+    window_ms = float(os.environ.get('COALESCE_WINDOW_MS', 0))
+    app.extensions['score_coalescer'] = ScoreCoalescer(
+        window_ms / 1000.0, int(os.environ.get('COALESCE_MAX_ITEMS', DEFAULT_MAX_ITEMS))
+    ) if window_ms > 0 else None
+    
+    # Cache of optimize responses for identical resubmissions
+    # (RESPONSE_CACHE_SIZE entries, 0 disables; RESPONSE_CACHE_TTL seconds)
+    cache_size = int(os.environ.get('RESPONSE_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    app.extensions['response_cache'] = ResponseCache(
+        cache_size, float(os.environ.get('RESPONSE_CACHE_TTL', DEFAULT_TTL))
+    ) if cache_size > 0 else None
+    
+    # Identical optimize requests in flight share one computation
+    # (SINGLE_FLIGHT=0 disables); with SINGLE_FLIGHT_DIR set, also across
+    # worker processes through lock files in that directory
+    lock_dir = os.environ.get('SINGLE_FLIGHT_DIR')
+    app.extensions['single_flight'] = SingleFlight(
+        FileLockStore(lock_dir) if lock_dir else None
+    ) if os.environ.get('SINGLE_FLIGHT', '1') != '0' else None
+    
     # Register blueprints
     app.register_blueprint(api, url_prefix='/api')
     
@@ -0,0 +1,149 @@
+import threading
+import time
+import numpy as np
+from typing import List, NamedTuple, Sequence, Tuple
+from ..models.enums import Purpose
+from .scoring import PURPOSES, ScoreTable
+
+# Default gathering window: wait up to 2 ms, or until 64 requests are pending
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_ITEMS = 64
+
+# One request's holdings: (table, names) lookups plus the purpose that orders its sales
+RankingRequest = Tuple[Sequence[Tuple[ScoreTable, Sequence[str]]], Purpose]
+
+
+class RankedHoldings(NamedTuple):
+    """
+    One request's holdings scored and put in sale order
+
+    Arrays are aligned with the request's lookups concatenated in order.
+    sale_order lists those positions highest score first (for the request's
+    purpose), ties in input order.
+    """
+    rows: np.ndarray  # score-table row, -1 for instruments not in the screener
+    scores: np.ndarray  # (holding, purpose) scores, 0 for unknown instruments
+    reason_masks: np.ndarray  # triggered rules carrying a sell reason
+    sale_order: np.ndarray
+
+
+def rank_holdings(requests: Sequence[RankingRequest]) -> List[RankedHoldings]:
+    """
+    Score and order the holdings of many requests in one vectorized pass
+
+    Names are resolved with one lookup per distinct table, scores and
+    reason masks are gathered per table, and a single lexsort on
+    (request, -score, position) puts every request's holdings in sale
+    order at once. The arrays are then split back out per request.
+    """
+    # Per table: its names plus the (request, first position, count) of every lookup
+    tables = {}
+    sizes = np.zeros(len(requests), dtype=np.int64)
+    for request, (lookups, _) in enumerate(requests):
+        for table, names in lookups:
+            names = list(names)
+            entry = tables.setdefault(id(table), (table, [], []))
+            entry[1].extend(names)
+            entry[2].append((request, int(sizes[request]), len(names)))
+            sizes[request] += len(names)
+    if not tables:
+        return [RankedHoldings(np.zeros(0, dtype=np.int64), np.zeros((0, len(PURPOSES))),
+                               np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)) for _ in requests]
+
+    parts = []
+    for table, names, spans in tables.values():
+        rows = table.rows(names)
+        counts = np.array([count for _, _, count in spans], dtype=np.int64)
+        request_of = np.repeat(np.array([request for request, _, _ in spans], dtype=np.int64), counts)
+        # Position in the request = the lookup's first position + index within the lookup
+        within = np.arange(len(names)) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(np.array([first for _, first, _ in spans], dtype=np.int64), counts) + within
+        parts.append((request_of, positions, rows, table.score_rows_at(rows), table.reason_masks_at(rows)))
+    request_of, positions, rows, scores, masks = (np.concatenate([part[i] for part in parts]) for i in range(5))
+
+    purpose_of = np.array([PURPOSES.index(purpose) for _, purpose in requests], dtype=np.int64)
+    sale_scores = scores[np.arange(len(rows)), purpose_of[request_of]]
+    order = np.lexsort((positions, -sale_scores, request_of))
+    # Holdings back in each request's input order, request by request
+    by_position = np.lexsort((positions, request_of))
+
+    bounds = np.concatenate([[0], np.cumsum(sizes)]).tolist()
+    sale_positions = positions[order]
+    rows, scores, masks = rows[by_position], scores[by_position], masks[by_position]
+    return [
+        RankedHoldings(rows[start:end], scores[start:end], masks[start:end], sale_positions[start:end])
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+class ScoreCoalescer:
+    """
+    Scores and orders the holdings of concurrent requests in one pass
+
+    Per-request scoring is mostly fixed Python and numpy call overhead. The
+    first request to arrive leads a batch: it waits up to `window` seconds
+    (or until `max_items` requests are pending), then runs one
+    rank_holdings pass over every pending request and hands each request
+    its share. Later arrivals wait for their leader.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW, max_items: int = DEFAULT_MAX_ITEMS):
+        self.window = window
+        self.max_items = max_items
+        self.batches = 0
+        self.requests = 0
+        self._condition = threading.Condition()
+        self._pending: List[_PendingRanking] = []
+        self._leading = False
+
+    def rank(self, lookups: Sequence[Tuple[ScoreTable, Sequence[str]]], purpose: Purpose) -> RankedHoldings:
+        """A request's holdings scored and ordered, together with concurrent requests"""
+        item = _PendingRanking((lookups, purpose))
+        with self._condition:
+            self._pending.append(item)
+            lead = not self._leading
+            if lead:
+                self._leading = True
+            elif len(self._pending) >= self.max_items:
+                self._condition.notify_all()
+        if lead:
+            self._lead()
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _lead(self):
+        deadline = time.perf_counter() + self.window
+        with self._condition:
+            while len(self._pending) < self.max_items:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, self._pending = self._pending, []
+            self._leading = False
+            self.batches += 1
+            self.requests += len(batch)
+        try:
+            for item, result in zip(batch, rank_holdings([item.request for item in batch])):
+                item.result = result
+        except Exception as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+
+
+class _PendingRanking:
+    """One request's holdings waiting for its batch"""
+
+    __slots__ = ('request', 'result', 'error', 'done')
+
+    def __init__(self, request: RankingRequest):
+        lookups, purpose = request
+        self.request = ([(table, list(names)) for table, names in lookups], purpose)
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
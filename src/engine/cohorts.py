@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Dict, Iterable, List, Mapping, Optional
+from .ingest import ScreenerSchema
+from .store import MetricStore
+
+# Peer-relative feature suffix -> value for instruments without a cohort
+PEER_FEATURES = {
+    '_peer_pct': 50.0,  # percentile rank within the cohort, 0-100
+    '_peer_z': 0.0,  # z-score within the cohort
+}
+
+
+def peer_feature_names(schema: ScreenerSchema) -> List[str]:
+    """Feature columns added for a schema, e.g. expense_ratio_peer_pct"""
+    if schema.cohort is None:
+        return []
+    return [field + suffix for field in cohort_metric_fields(schema) for suffix in PEER_FEATURES]
+
+
+def cohort_metric_fields(schema: ScreenerSchema) -> List[str]:
+    """Metrics compared within cohorts: every numeric field except the price"""
+    return [field for field, _ in schema.columns.values() if field != schema.price]
+
+
+def peer_feature_default(name: str, length: int) -> Optional[np.ndarray]:
+    """Neutral column for a peer feature when no cohort data is available, None if not a feature"""
+    for suffix, default in PEER_FEATURES.items():
+        if name.endswith(suffix):
+            return np.full(length, default)
+    return None
+
+
+def with_peer_features(names: np.ndarray, columns: Mapping[str, np.ndarray], schema: ScreenerSchema,
+                       features: Iterable[str], previous: Optional[Mapping] = None) -> Dict[str, np.ndarray]:
+    """
+    Metric columns plus the requested percentile and z-score features within cohorts
+
+    Only the peer features named in `features` (those the active scoring
+    rules reference) are built, since each costs 8 bytes per row in every
+    worker. Cohorts are the schema's cohort field (sub-sector,
+    sub-category); instruments without one get neutral features.
+    Statistics are computed with vectorized group-bys over the whole
+    universe. Given the previous snapshot's MetricStore, features it
+    already has are only recomputed for cohorts with an added, removed or
+    changed member; every other row keeps its previous values.
+    """
+    columns = dict(columns)
+    features = set(features)
+    wanted: Dict[str, List[str]] = {}
+    for field in cohort_metric_fields(schema) if schema.cohort is not None else []:
+        suffixes = [suffix for suffix in PEER_FEATURES if field + suffix in features]
+        if suffixes:
+            wanted[field] = suffixes
+    if not wanted:
+        return columns
+    cohort = columns[schema.cohort]
+
+    reused = [field for field, suffixes in wanted.items()
+              if isinstance(previous, MetricStore) and all(field + suffix in previous.columns for suffix in suffixes)]
+    recompute = np.ones(len(names), dtype=bool)
+    previous_rows = None
+    if reused:
+        previous_rows, recompute = _changed_cohort_rows(names, columns, previous, [schema.cohort, *reused])
+        print(f"Cohort features ({schema.label}): recomputed {int(recompute.sum())} of {len(names)} row(s)")
+
+    groupings = {}
+    for field, suffixes in wanted.items():
+        reuse = field in reused
+        if reuse not in groupings:
+            rows = np.flatnonzero(recompute) if reuse else np.arange(len(names))
+            groupings[reuse] = (rows, np.unique(cohort[rows], return_inverse=True)[1], cohort[rows] == 0)
+        rows, groups, unassigned = groupings[reuse]
+        fresh = dict(zip(PEER_FEATURES, _cohort_stats(groups, columns[field][rows])))
+        for suffix in suffixes:
+            feature = np.empty(len(names))
+            if reuse:
+                feature[~recompute] = previous.columns[field + suffix][previous_rows[~recompute]]
+            feature[rows] = np.where(unassigned, PEER_FEATURES[suffix], fresh[suffix])
+            feature.flags.writeable = False
+            columns[field + suffix] = feature
+    return columns
+
+
+def _changed_cohort_rows(names: np.ndarray, columns: Mapping[str, np.ndarray], previous: MetricStore,
+                         fields: List[str]):
+    """Previous row of each name (-1 if new) and which rows belong to a cohort that changed"""
+    previous_names = previous.names
+    if len(previous_names):
+        previous_rows = np.minimum(previous_names.searchsorted(names), len(previous_names) - 1)
+        matched = previous_names[previous_rows] == names
+    else:
+        previous_rows = np.zeros(len(names), dtype=np.int64)
+        matched = np.zeros(len(names), dtype=bool)
+
+    unchanged = matched.copy()
+    for field in fields:
+        unchanged[matched] &= columns[field][matched] == previous.columns[field][previous_rows[matched]]
+    previous_unchanged = np.zeros(len(previous_names), dtype=bool)
+    previous_unchanged[previous_rows[unchanged]] = True
+
+    # A cohort is dirty if any member was added, removed or edited
+    cohort = columns[fields[0]]
+    dirty = np.union1d(cohort[~unchanged], previous.columns[fields[0]][~previous_unchanged])
+    return np.where(matched, previous_rows, -1), np.isin(cohort, dirty)
+
+
+def _cohort_stats(groups: np.ndarray, values: np.ndarray):
+    """Mid-rank percentile (ties share a rank) and z-score of each value within its group"""
+    n = len(values)
+    if not n:
+        return np.empty(0), np.empty(0)
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    sorted_values = values[order]
+    group_starts = np.ones(n, dtype=bool)
+    group_starts[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    tie_starts = group_starts.copy()
+    tie_starts[1:] |= sorted_values[1:] != sorted_values[:-1]
+
+    group_id = np.cumsum(group_starts) - 1
+    tie_id = np.cumsum(tie_starts) - 1
+    group_first = np.flatnonzero(group_starts)
+    tie_first = np.flatnonzero(tie_starts)
+    group_size = np.diff(np.append(group_first, n))
+    tie_size = np.diff(np.append(tie_first, n))
+    below = tie_first[tie_id] - group_first[group_id]
+    percentile = np.empty(n)
+    percentile[order] = 100.0 * (below + 0.5 * tie_size[tie_id]) / group_size[group_id]
+
+    counts = np.bincount(groups)
+    mean = np.bincount(groups, values) / counts
+    deviation = values - mean[groups]
+    std = np.sqrt(np.bincount(groups, deviation * deviation) / counts)[groups]
+    z_score = np.divide(deviation, std, out=np.zeros(n), where=std > 0)
+    return percentile, z_score
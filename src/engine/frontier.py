@@ -0,0 +1,71 @@
+import numpy as np
+from typing import Dict, List, Sequence
+
+# Largest share of total AUM a single request may liquidate
+MAX_LIQUIDATION_FRACTION = 0.8
+
+
+class PlanFrontier:
+    """
+    Greedy liquidation plans for every amount of one household, built once
+
+    Once assets are scored and sorted, the greedy plan for any amount is
+    fixed by the running total of their values: the excess bank balance
+    goes first, then whole assets in order, the last one partially. The
+    frontier keeps that running total, so a batch of amounts is cut with
+    one vectorized searchsorted.
+    """
+
+    def __init__(self, assets: Sequence[Dict], bank_excess: float, total_aum: float):
+        self.assets = list(assets)  # sorted by score, highest first
+        self.bank_excess = max(float(bank_excess), 0.0)
+        self.total_aum = float(total_aum)
+        self.cumulative = np.cumsum(np.array([asset['estimated_value'] for asset in self.assets], dtype=np.float64))
+        self.max_amount = self.total_aum * MAX_LIQUIDATION_FRACTION
+
+    def cut(self, amounts) -> Dict[str, np.ndarray]:
+        """
+        Where each amount's plan stops, as arrays aligned with `amounts`
+
+        bank: excess bank balance sold; assets_sold: leading assets touched
+        (all sold whole except the last); last_value: rupees from the last
+        one; shortfall: amount the assets cannot cover; rejected: above the
+        share of AUM a request may liquidate.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        bank = np.minimum(self.bank_excess, amounts)
+        remaining = amounts - bank
+        n = len(self.cumulative)
+        last = np.searchsorted(self.cumulative, remaining, side='left')
+        covered = np.concatenate([[0.0], self.cumulative])
+        needs_assets = remaining > 0
+        assets_sold = np.where(needs_assets, np.minimum(last + 1, n), 0)
+        last_value = np.where(needs_assets & (last < n), remaining - covered[np.minimum(last, n)], 0.0)
+        if n:
+            exhausted = needs_assets & (last >= n)
+            last_value = np.where(exhausted, covered[n] - covered[n - 1], last_value)
+        shortfall = np.maximum(remaining - covered[n], 0.0)
+        return {
+            'bank': bank,
+            'assets_sold': assets_sold,
+            'last_value': last_value,
+            'shortfall': shortfall,
+            'rejected': amounts > self.max_amount,
+        }
+
+    def plan_summaries(self, amounts: List[float]) -> List[Dict]:
+        """Compact plan per amount, indexing into the frontier's asset order"""
+        cut = self.cut(amounts)
+        return [
+            {
+                'amount': amount,
+                'status': 'REJECTED' if rejected else 'OK',
+                'bank_to_sell': round(bank, 2),
+                'assets_sold': assets_sold,
+                'last_asset_value_to_sell': round(last_value, 2),
+                'shortfall': round(shortfall, 2)
+            }
+            for amount, rejected, bank, assets_sold, last_value, shortfall in zip(
+                np.asarray(amounts, dtype=np.float64).tolist(), cut['rejected'].tolist(), cut['bank'].tolist(),
+                cut['assets_sold'].tolist(), cut['last_value'].tolist(), cut['shortfall'].tolist())
+        ]
@@ -0,0 +1,563 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from collections import Counter
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from ..models.enums import SEBIRiskCategory
+
+# Screener CSV column -> (metrics field, default used when the cell is blank)
+STOCK_COLUMNS = {
+    'Close Price': ('close_price', 0.0),
+    'PE Ratio': ('pe_ratio', 25.0),
+    'RSI – 14D': ('rsi_14d', 50.0),
+    'Pledged Promoter Holdings': ('pledged_promoter_holdings', 0.0),
+    'Promoter Holding': ('promoter_holding', 50.0),
+    'Beta': ('beta', 1.0),
+    '6M Return vs Nifty': ('six_month_return_vs_nifty', 0.0),
+    '5Y CAGR': ('five_year_cagr', 12.0),
+    'Debt to Equity': ('debt_to_equity', 0.5),
+    'ROCE': ('roce', 15.0),
+    'Return on Equity': ('return_on_equity', 15.0),
+    'Dividend Yield': ('dividend_yield', 2.0),
+    'Free Cash Flow': ('free_cash_flow', 1000.0),
+}
+
+MF_COLUMNS = {
+    'CAGR 3Y': ('cagr_3y', 12.0),
+    'Expense Ratio': ('expense_ratio', 1.5),
+    'Volatility': ('volatility', 15.0),
+    'Sharpe Ratio': ('sharpe_ratio', 1.0),
+    'Alpha': ('alpha', 0.0),
+    'Sortino Ratio': ('sortino_ratio', 1.2),
+    'Tracking Error': ('tracking_error', 3.0),
+    'Time since inception': ('time_since_inception', 24.0),
+    'NAV': ('nav', 0.0),
+}
+
+# SEBI categories are stored as small integer codes indexing this list
+SEBI_CATEGORIES = list(SEBIRiskCategory)
+
+# Substring patterns checked in order; unmatched labels map to MODERATE
+SEBI_CATEGORY_PATTERNS = [
+    ('very high', SEBIRiskCategory.VERY_HIGH),
+    ('high', SEBIRiskCategory.HIGH),
+    ('moderately high', SEBIRiskCategory.MODERATELY_HIGH),
+    ('moderate', SEBIRiskCategory.MODERATE),
+    ('moderately low', SEBIRiskCategory.MODERATELY_LOW),
+    ('low', SEBIRiskCategory.LOW),
+]
+
+# Bump whenever the cached column layout or coercion rules change
+CACHE_FORMAT_VERSION = 8
+
+# Line hash constants: xxHash64 round primes and the murmur3 64-bit finalizer
+_HASH_PRIME_1 = np.uint64(0x9E3779B185EBCA87)
+_HASH_PRIME_2 = np.uint64(0xC2B2AE3D27D4EB4F)
+_HASH_FINALIZER = [(np.uint64(33), np.uint64(0xFF51AFD7ED558CCD)), (np.uint64(33), np.uint64(0xC4CEB9FE1A85EC53))]
+
+# Source lines parsed per batch; peak ingest memory is one batch plus the compacted result
+INGEST_BATCH_ROWS = 50_000
+
+ScreenerColumns = Tuple[List[str], Dict[str, np.ndarray]]
+
+LINE_COLUMN = '__line__'
+
+
+class ScreenerSchema(NamedTuple):
+    """How one screener CSV maps onto metric columns"""
+    label: str
+    columns: Dict[str, Tuple[str, float]]  # CSV column -> (metrics field, default)
+    categorical: Dict[str, Tuple[str, Callable[[pd.Series], np.ndarray]]] = {}  # field -> (CSV column, encoder)
+    cohort: Optional[str] = None  # categorical field grouping peers for cohort features
+    price: Optional[str] = None  # field holding the price of one share / unit (0 if unknown)
+
+
+class CompiledScreener(NamedTuple):
+    """Name-sorted metric columns for one screener plus the source content hash"""
+    names: np.ndarray
+    columns: Mapping[str, np.ndarray]
+    source_hash: str
+    line_hashes: np.ndarray  # hash of the source line each row came from, for delta reloads
+
+
+def load_columns(csv_path: str, schema: ScreenerSchema, cache_dir: Optional[str] = None,
+                 previous: Optional[CompiledScreener] = None) -> CompiledScreener:
+    """
+    Load a screener as sorted names plus one typed column per metric, memory-mapping the compiled cache
+
+    Rows are deduplicated by name (last occurrence wins) and sorted so the
+    name column doubles as a binary-search index. With a cache_dir every
+    column is published as a read-only .npy file that every worker process
+    maps, so the OS page cache holds one copy of the universe per box.
+
+    The cache is keyed by the CSV's size, mtime and SHA-256 content hash. A
+    matching size and mtime is trusted as-is; otherwise the content hash
+    decides, so touching a file without changing it does not force a re-parse.
+    When the source did change and the previous compiled version is given,
+    only added or edited lines are parsed (see compile_screener).
+    """
+    if cache_dir is None:
+        return _read_only(compile_screener(csv_path, schema, previous), _hash_file(csv_path))
+
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    pointer_path = os.path.join(cache_dir, stem + '.json')
+    stat = os.stat(csv_path)
+    fingerprint = {'format': CACHE_FORMAT_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    cached = _read_pointer(pointer_path)
+    if cached.get('format') == CACHE_FORMAT_VERSION and cached.get('size') == stat.st_size and 'data' in cached:
+        mapped = _map_columns(cache_dir, cached['data'])
+        if mapped is not None:
+            if cached.get('mtime_ns') == stat.st_mtime_ns:
+                return CompiledScreener(*mapped[:2], cached['sha256'], mapped[2])
+            fingerprint['sha256'] = _hash_file(csv_path)
+            if cached.get('sha256') == fingerprint['sha256']:
+                fingerprint['data'] = cached['data']
+                _write_pointer(pointer_path, fingerprint)
+                return CompiledScreener(*mapped[:2], fingerprint['sha256'], mapped[2])
+
+    fingerprint.setdefault('sha256', _hash_file(csv_path))
+    compiled = compile_screener(csv_path, schema, previous)
+    fingerprint['data'] = f"{stem}-v{CACHE_FORMAT_VERSION}-{fingerprint['sha256'][:16]}"
+    if _publish_columns(cache_dir, fingerprint['data'], *compiled):
+        _write_pointer(pointer_path, fingerprint)
+        _remove_stale_versions(cache_dir, stem, keep=fingerprint['data'])
+        mapped = _map_columns(cache_dir, fingerprint['data'])
+        if mapped is not None:
+            return CompiledScreener(*mapped[:2], fingerprint['sha256'], mapped[2])
+    return _read_only(compiled, fingerprint['sha256'])
+
+
+def compile_screener(csv_path: str, schema: ScreenerSchema, previous: Optional[CompiledScreener] = None,
+                     batch_rows: int = INGEST_BATCH_ROWS) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """
+    Stream a screener CSV into (names, columns, line_hashes), reusing unchanged rows of `previous`
+
+    The file is read in batches of batch_rows lines and each batch is
+    reduced to typed arrays before the next is read, so peak memory is one
+    batch plus the compacted result regardless of universe size.
+
+    Without `previous` (a cold build) nothing can be reused, so the file
+    goes straight through the chunked CSV parser and its rows get zero line
+    hashes; the first reload after a cold build parses every line.
+
+    On a reload every data line is hashed together with the header. Lines
+    whose hash matches a row of the previous version reuse that row as-is;
+    only the remaining lines go through the CSV parser: added or edited
+    ones, plus the few that never owned a row (duplicates shadowed by a
+    later line). Removed lines simply do not appear. The result is then
+    compacted exactly like a full parse, so it is identical to re-reading
+    the whole file.
+    """
+    if previous is None:
+        return _compile_without_hashes(csv_path, schema, batch_rows)
+    failures = Counter()
+    matcher = _RowMatcher(previous)
+    parts = []
+    parsed = reused = 0
+    try:
+        with open(csv_path, 'rb') as f:
+            header = next((line.rstrip(b'\r\n') for line in f if line.strip()), None)
+            if header is None:
+                return compact_rows(*_empty_part(schema))
+            if header.count(b'"') % 2:
+                raise _MultiLineField()
+            salt = int.from_bytes(hashlib.blake2b(header, digest_size=8).digest(), 'little')
+            numbered_header = f"{LINE_COLUMN},".encode() + header
+            placeholder = b'-1,' + _placeholder_row(header)
+
+            for first_position, lines in _line_batches(f, batch_rows):
+                hashes = _hash_lines(salt, lines)
+                matched = matcher.match(hashes)
+                changed = np.flatnonzero(matched < 0)
+                reused_positions = np.flatnonzero(matched >= 0)
+
+                # Parse only the changed lines, tagged with their position in the file
+                numbered = [numbered_header, placeholder]
+                numbered.extend(b'%d,' % (first_position + i) + lines[i] for i in changed.tolist())
+                df = _read_screener_csv(io.BytesIO(b'\n'.join(numbered)))
+                df = df[df['Name'].notna()]
+                parsed_names, parsed_columns = read_columns(df, schema, failures)
+                parsed_positions = df[LINE_COLUMN].to_numpy(dtype=np.int64)
+
+                reused_rows = matched[reused_positions]
+                parts.append([
+                    np.concatenate([reused_positions + first_position, parsed_positions]),
+                    np.concatenate([matcher.names(reused_rows), encode_names(parsed_names)]),
+                    {field: np.concatenate([matcher.column(field, reused_rows, column.dtype), column])
+                     for field, column in parsed_columns.items()},
+                    np.concatenate([hashes[reused_positions], hashes[parsed_positions - first_position]]),
+                ])
+                parsed += len(changed)
+                reused += len(reused_positions)
+    except _MultiLineField:
+        # Quoted fields span lines, so positions cannot be tracked line by line
+        return _compile_without_hashes(csv_path, schema, batch_rows)
+
+    _report_failures(failures, schema)
+    print(f"Delta ingest {os.path.basename(csv_path)}: parsed {parsed} changed line(s), "
+          f"reused {reused} row(s)")
+    return compact_rows(*_merge_parts(parts, schema))
+
+
+def read_columns(df: pd.DataFrame, schema: ScreenerSchema, failures: Optional[Counter] = None) -> ScreenerColumns:
+    """Turn parsed screener rows (with names) into names and typed metric columns"""
+    failures = failures if failures is not None else Counter()
+    columns = _coerce_columns(df, schema.columns, failures)
+    for field_name, (csv_column, encode) in schema.categorical.items():
+        columns[field_name] = encode(df[csv_column] if csv_column in df.columns else pd.Series(index=df.index, dtype=object))
+    return df['Name'].astype(str).tolist(), columns
+
+
+def compact_rows(names: np.ndarray, columns: Dict[str, np.ndarray], line_hashes: np.ndarray,
+                 positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """
+    Deduplicate and sort metric columns by name
+
+    Names are UTF-8 bytes; for duplicates the row with the highest file
+    position (default: array order) wins. Only index arrays and one sorted
+    copy of the names are allocated, so peak memory stays near the result.
+    """
+    if positions is None:
+        positions = np.arange(len(names))
+    order = np.lexsort((positions, names))
+    sorted_names = names[order]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = sorted_names[1:] != sorted_names[:-1]
+    keep = order[last]
+    unique_names = sorted_names[last]
+    del sorted_names, order
+
+    return unique_names, {field: column[keep] for field, column in columns.items()}, line_hashes[keep]
+
+
+def encode_names(names: Sequence[str]) -> np.ndarray:
+    """Instrument names as a fixed-width UTF-8 byte array (a quarter the size of numpy unicode)"""
+    if not len(names):
+        return np.array([], dtype='S1')
+    return np.array([name.encode('utf-8') for name in names])
+
+
+class _MultiLineField(Exception):
+    """Raised when a quoted CSV field spans physical lines"""
+
+
+class _RowMatcher:
+    """Finds rows of a previous compiled screener by source-line hash"""
+
+    def __init__(self, previous: Optional[CompiledScreener]):
+        self._previous = previous
+        # Cold builds carry zero hashes, which match nothing
+        if previous is not None and np.any(previous.line_hashes):
+            self._order = np.argsort(previous.line_hashes, kind='stable')
+            self._sorted_hashes = np.asarray(previous.line_hashes)[self._order]
+        else:
+            self._order = self._sorted_hashes = None
+
+    def match(self, hashes: np.ndarray) -> np.ndarray:
+        """Previous row index for each hash, or -1 where the line is new or edited"""
+        if self._sorted_hashes is None:
+            return np.full(len(hashes), -1, dtype=np.int64)
+        index = np.minimum(np.searchsorted(self._sorted_hashes, hashes), len(self._sorted_hashes) - 1)
+        return np.where(self._sorted_hashes[index] == hashes, self._order[index], -1).astype(np.int64)
+
+    def names(self, rows: np.ndarray) -> np.ndarray:
+        if not len(rows):
+            return np.array([], dtype='S1')
+        return self._previous.names[rows]
+
+    def column(self, field: str, rows: np.ndarray, dtype) -> np.ndarray:
+        if not len(rows):
+            return np.array([], dtype=dtype)
+        return self._previous.columns[field][rows]
+
+
+def _line_batches(f, batch_rows: int) -> Iterator[Tuple[int, List[bytes]]]:
+    """Yield (position of first line, non-blank data lines) in batches from a binary file"""
+    position = 0
+    while True:
+        raw = list(islice(f, batch_rows))
+        if not raw:
+            return
+        lines = [line.rstrip(b'\r\n') for line in raw]
+        lines = [line for line in lines if line.strip()]
+        if any(line.count(b'"') % 2 for line in lines):
+            raise _MultiLineField()
+        if lines:
+            yield position, lines
+            position += len(lines)
+
+
+def _hash_lines(salt: int, lines: List[bytes]) -> np.ndarray:
+    """
+    Stable 64-bit hash of each line, salted with the header so a schema change invalidates all rows
+
+    Lines are packed into a zero-padded byte matrix and consumed eight bytes
+    at a time for all lines at once (xxHash64 rounds plus the murmur3
+    finalizer). Each line only takes rounds for its own words, so its hash
+    does not depend on the other lines of the batch, and its length is
+    mixed in so trailing zero bytes cannot collide with padding.
+    """
+    lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    word_counts = -(-lengths // 8)
+    width = max(8, int(word_counts.max()) * 8)
+    words = np.array(lines, dtype=f'S{width}').view('<u8').reshape(len(lines), -1).T.astype(np.uint64)
+    shortest = int(word_counts.min())
+    hashes = lengths.astype(np.uint64) * _HASH_PRIME_1 + np.uint64(salt)
+    for i, word in enumerate(words):
+        mixed = word * _HASH_PRIME_2
+        mixed += hashes
+        mixed = (mixed << np.uint64(31)) | (mixed >> np.uint64(33))
+        mixed *= _HASH_PRIME_1
+        if i < shortest:
+            hashes = mixed
+        else:
+            np.copyto(hashes, mixed, where=word_counts > i)
+    for shift, multiplier in _HASH_FINALIZER:
+        hashes ^= hashes >> shift
+        hashes *= multiplier
+    return hashes ^ (hashes >> np.uint64(33))
+
+
+def _compile_without_hashes(csv_path: str, schema: ScreenerSchema,
+                            batch_rows: int) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """Chunked full parse with zero line hashes, for cold builds and files whose lines cannot be hashed individually"""
+    failures = Counter()
+    parts = []
+    with open(csv_path, 'rb') as f:
+        header = next((line.rstrip(b'\r\n') for line in f if line.strip()), None)
+        if header is None:
+            return compact_rows(*_empty_part(schema))
+        prefix = header + b'\n'
+        if not header.count(b'"') % 2:
+            prefix += _placeholder_row(header) + b'\n'
+        for chunk in _read_screener_csv(io.BufferedReader(_PrefixedReader(prefix, f)), chunksize=batch_rows):
+            chunk = chunk[chunk['Name'].notna()]
+            names, columns = read_columns(chunk, schema, failures)
+            parts.append([chunk.index.to_numpy(dtype=np.int64), encode_names(names), columns,
+                          np.zeros(len(chunk), dtype=np.uint64)])
+    _report_failures(failures, schema)
+    return compact_rows(*_merge_parts(parts, schema))
+
+
+def _placeholder_row(header: bytes) -> bytes:
+    """
+    An empty row for the header's columns, parsed first and then dropped as nameless
+
+    It keeps pandas from treating an over-long first data line as carrying
+    an index; such lines are skipped like anywhere else in the file.
+    """
+    return b',' * (len(next(csv.reader([header.decode('utf-8')]))) - 1)
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Raw binary stream of `prefix` followed by the rest of an open file"""
+
+    def __init__(self, prefix: bytes, f):
+        self._prefix = prefix
+        self._f = f
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        return self._f.readinto(buffer)
+
+
+def _empty_part(schema: ScreenerSchema) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """Names, columns and line hashes of a screener without rows"""
+    empty = _read_screener_csv(io.BytesIO(b'Name\n'))
+    names, columns = read_columns(empty, schema)
+    return encode_names(names), columns, np.array([], dtype=np.uint64)
+
+
+def _merge_parts(parts: List[list], schema: ScreenerSchema) -> Tuple:
+    """Concatenate per-batch [positions, names, columns, line_hashes], releasing batch arrays as they merge"""
+    if not parts:
+        return _empty_part(schema)
+
+    def merge(component: int) -> np.ndarray:
+        merged = np.concatenate([part[component] for part in parts])
+        for part in parts:
+            part[component] = None
+        return merged
+
+    positions, names, line_hashes = merge(0), merge(1), merge(3)
+    columns = {}
+    for field in list(parts[0][2]):
+        columns[field] = np.concatenate([part[2].pop(field) for part in parts])
+    parts.clear()
+    return names, columns, line_hashes, positions
+
+
+def _read_only(compiled: Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray], source_hash: str) -> CompiledScreener:
+    """Wrap an in-memory compiled screener, freezing its arrays"""
+    names, columns, line_hashes = compiled
+    for array in (names, line_hashes, *columns.values()):
+        array.flags.writeable = False
+    return CompiledScreener(names, MappingProxyType(columns), source_hash, line_hashes)
+
+
+def _read_screener_csv(csv_source, chunksize: Optional[int] = None):
+    """Read a screener CSV (path or buffer) into a DataFrame, or an iterator of chunks"""
+    return pd.read_csv(
+        csv_source,
+        encoding='utf-8',
+        on_bad_lines='warn',
+        quoting=1,
+        skipinitialspace=True,
+        dtype={'Name': str},
+        chunksize=chunksize
+    )
+
+
+def _coerce_columns(df: pd.DataFrame, column_spec: Dict[str, Tuple[str, float]],
+                    failures: Counter) -> Dict[str, np.ndarray]:
+    """Coerce screener columns to floats, filling blanks with defaults and counting bad values"""
+    columns = {}
+    for csv_column, (field_name, default) in column_spec.items():
+        if csv_column not in df.columns:
+            failures[csv_column] += len(df)
+            columns[field_name] = np.full(len(df), default, dtype=np.float64)
+            continue
+
+        raw = df[csv_column]
+        values = pd.to_numeric(raw, errors='coerce')
+        failures[csv_column] += int((values.isna() & raw.notna()).sum())
+        columns[field_name] = values.fillna(default).to_numpy(dtype=np.float64)
+    return columns
+
+
+def _report_failures(failures: Counter, schema: ScreenerSchema):
+    """Print one aggregate warning per column that had missing or unparseable values"""
+    for csv_column, (_, default) in schema.columns.items():
+        if failures[csv_column]:
+            print(f"Warning: {schema.label} screener column '{csv_column}' has {failures[csv_column]} "
+                  f"missing or unparseable value(s), using default {default}")
+
+
+def _map_sebi_risk_categories(raw: pd.Series) -> np.ndarray:
+    """Map free-text SEBI risk labels to category codes (first matching pattern wins)"""
+    # Object dtype so a batch with only blank labels still has the .str accessor
+    labels = raw.astype(object).str.lower().str.strip()
+    conditions = [labels.str.contains(pattern, regex=False, na=False).to_numpy(dtype=bool)
+                  for pattern, _ in SEBI_CATEGORY_PATTERNS]
+    codes = [SEBI_CATEGORIES.index(category) for _, category in SEBI_CATEGORY_PATTERNS]
+    default = SEBI_CATEGORIES.index(SEBIRiskCategory.MODERATE)
+    return np.select(conditions, codes, default=default).astype(np.int8)
+
+
+def _hash_cohort_labels(raw: pd.Series) -> np.ndarray:
+    """Stable 64-bit code per cohort label (0 for blank), identical across batches, reloads and workers"""
+    codes, labels = pd.factorize(raw.astype(object).str.strip())
+    # Slot 0 of the lookup is for missing labels (factorize code -1)
+    lookup = np.array(
+        [0] + [int.from_bytes(hashlib.blake2b(label.encode('utf-8'), digest_size=8).digest(), 'little')
+               if label else 0 for label in labels],
+        dtype=np.uint64
+    )
+    return lookup[codes + 1]
+
+
+STOCK_SCHEMA = ScreenerSchema('Stock', STOCK_COLUMNS,
+                              {'sub_sector': ('Sub-Sector', _hash_cohort_labels)},
+                              cohort='sub_sector', price='close_price')
+
+MF_SCHEMA = ScreenerSchema('Mutual Fund', MF_COLUMNS,
+                           {'sebi_risk_category': ('SEBI Risk Category', _map_sebi_risk_categories),
+                            'sub_category': ('Sub Category', _hash_cohort_labels)},
+                           cohort='sub_category', price='nav')
+
+
+def _hash_file(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_pointer(pointer_path: str) -> Dict:
+    """Read the fingerprint pointer for a compiled screener, or {} if absent"""
+    try:
+        with open(pointer_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: ignoring unreadable screener cache {pointer_path}: {str(e)}")
+        return {}
+
+
+def _map_columns(cache_dir: str, data_dirname: str) -> Optional[Tuple[np.ndarray, Mapping[str, np.ndarray], np.ndarray]]:
+    """Memory-map a published (names, columns, line_hashes) version read-only, or None if unavailable"""
+    data_dir = os.path.join(cache_dir, data_dirname)
+    columns_dir = os.path.join(data_dir, 'columns')
+    try:
+        names = np.load(os.path.join(data_dir, 'names.npy'), mmap_mode='r', allow_pickle=False)
+        line_hashes = np.load(os.path.join(data_dir, 'line_hashes.npy'), mmap_mode='r', allow_pickle=False)
+        columns = {
+            os.path.splitext(filename)[0]: np.load(os.path.join(columns_dir, filename), mmap_mode='r', allow_pickle=False)
+            for filename in sorted(os.listdir(columns_dir))
+        }
+        return names, MappingProxyType(columns), line_hashes
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: ignoring unreadable screener cache {data_dir}: {str(e)}")
+        return None
+
+
+def _publish_columns(cache_dir: str, data_dirname: str, names: np.ndarray, columns: Mapping[str, np.ndarray],
+                     line_hashes: np.ndarray) -> bool:
+    """Write a compiled screener into an immutable directory, renamed into place atomically"""
+    data_dir = os.path.join(cache_dir, data_dirname)
+    if os.path.isdir(data_dir):
+        return True
+    tmp_dir = f"{data_dir}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.join(tmp_dir, 'columns'), exist_ok=True)
+        np.save(os.path.join(tmp_dir, 'names.npy'), names, allow_pickle=False)
+        np.save(os.path.join(tmp_dir, 'line_hashes.npy'), line_hashes, allow_pickle=False)
+        for field, column in columns.items():
+            np.save(os.path.join(tmp_dir, 'columns', field + '.npy'), column, allow_pickle=False)
+        os.rename(tmp_dir, data_dir)
+        return True
+    except Exception as e:
+        # Another worker may have published the same content first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if os.path.isdir(data_dir):
+            return True
+        print(f"Warning: could not write screener cache {data_dir}: {str(e)}")
+        return False
+
+
+def _write_pointer(pointer_path: str, fingerprint: Dict):
+    """Atomically replace the fingerprint pointer"""
+    tmp_path = f"{pointer_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(fingerprint, f)
+        os.replace(tmp_path, pointer_path)
+    except Exception as e:
+        print(f"Warning: could not write screener cache {pointer_path}: {str(e)}")
+
+
+def _remove_stale_versions(cache_dir: str, stem: str, keep: str):
+    """Delete superseded compiled versions; workers still mapping them keep their pages"""
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(stem + '-') and entry != keep and not entry.endswith('.tmp'):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
@@ -1,160 +1,69 @@
-import os
-import random
-import pandas as pd
-from typing import Dict, List, Tuple
-from ..models.enums import Purpose, Timeline, SEBIRiskCategory
+import numpy as np
+from typing import Dict, List, Mapping, Optional, Tuple
+from ..models.enums import Purpose, Timeline
 from ..models.metrics import StockMetrics, MFMetrics
-from ..utils.parser import UserDataParser
+from ..utils.parser import DEFAULT_RECURRING_PERIODS, UserDataParser
+from .scoring import PURPOSES, ScoreTable
+from .snapshot import ScreenerSnapshot, load_screener_snapshot
+from .coalescer import RankedHoldings, ScoreCoalescer, rank_holdings
+from .frontier import MAX_LIQUIDATION_FRACTION, PlanFrontier
+from .solver import DEFAULT_TIME_BUDGET, solve_liquidation
+from .tax import TAX_DRAG_WEIGHT, TaxSummary, capital_gains_tax, gross_up_sales, tax_drag, tax_profile
+from .valuation import UNIT_DECIMALS, round_sale_quantity, value_holdings
+
+# Questionnaire timeline answer -> Timeline
+TIMELINE_ANSWERS = {
+    'today': Timeline.IMMEDIATE,
+    '2-3_days': Timeline.IMMEDIATE,
+    'within_week': Timeline.WITHIN_WEEK,
+    '1-4_weeks': Timeline.ONE_TO_FOUR_WEEKS,
+    'no_timeline': Timeline.NO_URGENCY
+}
+
+# Units left in a partly sold holding are rounded to this many decimals to
+# drop float noise from repeated subtraction
+_UNITS_LEFT_DECIMALS = 9
 
 class SmartLiquidityEngine:
-    def __init__(self):
-        self.stock_metrics = {}
-        self.mf_metrics = {}
+    def __init__(self, snapshot: Optional[ScreenerSnapshot] = None,
+                 solver_time_budget: float = DEFAULT_TIME_BUDGET,
+                 coalescer: Optional[ScoreCoalescer] = None):
+        # Screener data is shared read-only across engines; load lazily when
+        # the engine is used standalone without a prebuilt snapshot
+        self.snapshot = snapshot
+        self.solver_time_budget = solver_time_budget
+        # Optional: scores and orders this request's holdings together with concurrent requests
+        self.coalescer = coalescer
         self.tax_slab_exhausted = {}
+        self._rankings = []
+
+    @property
+    def stock_metrics(self) -> Mapping[str, StockMetrics]:
+        if self.snapshot is None:
+            self.load_asset_data()
+        return self.snapshot.stock_metrics
+
+    @property
+    def mf_metrics(self) -> Mapping[str, MFMetrics]:
+        if self.snapshot is None:
+            self.load_asset_data()
+        return self.snapshot.mf_metrics
+
+    @property
+    def stock_scores(self) -> ScoreTable:
+        if self.snapshot is None:
+            self.load_asset_data()
+        return self.snapshot.stock_scores
+
+    @property
+    def mf_scores(self) -> ScoreTable:
+        if self.snapshot is None:
+            self.load_asset_data()
+        return self.snapshot.mf_scores
 
     def load_asset_data(self):
         """Load asset metrics from CSV files with fallback to sample data"""
-        try:
-            current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            stock_csv_path = os.path.join(current_dir, 'assets', 'Stock_Screener.csv')
-            mf_csv_path = os.path.join(current_dir, 'assets', 'Mutual_Fund_Screener.csv')
-            
-            self._load_stock_data(stock_csv_path)
-            self._load_mf_data(mf_csv_path)
-                
-        except Exception as e:
-            print(f"Error loading data: {str(e)}")
-            self._initialize_sample_stock_data()
-            self._initialize_sample_mf_data()
-
-    def _load_stock_data(self, stock_csv_path: str):
-        """Load stock data from CSV"""
-        if os.path.exists(stock_csv_path):
-            df = pd.read_csv(
-                stock_csv_path,
-                encoding='utf-8',
-                on_bad_lines='warn',
-                quoting=1,
-                skipinitialspace=True
-            )
-            
-            # Process each stock
-            for _, row in df.iterrows():
-                try:
-                    stock_name = row['Name']
-                    if pd.isna(stock_name):
-                        continue
-                        
-                    self.stock_metrics[stock_name] = StockMetrics(
-                        pe_ratio=float(row['PE Ratio']) if pd.notna(row['PE Ratio']) else 25.0,
-                        rsi_14d=float(row['RSI – 14D']) if pd.notna(row['RSI – 14D']) else 50.0,
-                        pledged_promoter_holdings=float(row['Pledged Promoter Holdings']) if pd.notna(row['Pledged Promoter Holdings']) else 0.0,
-                        promoter_holding=float(row['Promoter Holding']) if pd.notna(row['Promoter Holding']) else 50.0,
-                        beta=float(row['Beta']) if pd.notna(row['Beta']) else 1.0,
-                        six_month_return_vs_nifty=float(row['6M Return vs Nifty']) if pd.notna(row['6M Return vs Nifty']) else 0.0,
-                        five_year_cagr=float(row['5Y CAGR']) if pd.notna(row['5Y CAGR']) else 12.0,
-                        debt_to_equity=float(row['Debt to Equity']) if pd.notna(row['Debt to Equity']) else 0.5,
-                        roce=float(row['ROCE']) if pd.notna(row['ROCE']) else 15.0,
-                        return_on_equity=float(row['Return on Equity']) if pd.notna(row['Return on Equity']) else 15.0,
-                        dividend_yield=float(row['Dividend Yield']) if pd.notna(row['Dividend Yield']) else 2.0,
-                        free_cash_flow=float(row['Free Cash Flow']) if pd.notna(row['Free Cash Flow']) else 1000.0
-                    )
-                except Exception as e:
-                    print(f"Error processing stock row for {stock_name}: {str(e)}")
-                    continue
-        else:
-            print(f"Warning: Stock screener CSV not found at {stock_csv_path}")
-            self._initialize_sample_stock_data()
-
-    def _load_mf_data(self, mf_csv_path: str):
-        """Load mutual fund data from CSV"""
-        if os.path.exists(mf_csv_path):
-            mf_df = pd.read_csv(
-                mf_csv_path,
-                encoding='utf-8',
-                on_bad_lines='warn',
-                quoting=1,
-                skipinitialspace=True
-            )
-            
-            # Process each MF
-            for _, row in mf_df.iterrows():
-                try:
-                    mf_name = row['Name']
-                    if pd.isna(mf_name):
-                        continue
-                    
-                    # Map SEBI risk category
-                    sebi_risk = row['SEBI Risk Category']
-                    sebi_risk_category = SEBIRiskCategory.MODERATE  # default
-                    if isinstance(sebi_risk, str):
-                        sebi_risk = sebi_risk.lower().strip()
-                        if 'very high' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.VERY_HIGH
-                        elif 'high' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.HIGH
-                        elif 'moderately high' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.MODERATELY_HIGH
-                        elif 'moderate' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.MODERATE
-                        elif 'moderately low' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.MODERATELY_LOW
-                        elif 'low' in sebi_risk:
-                            sebi_risk_category = SEBIRiskCategory.LOW
-                    
-                    self.mf_metrics[mf_name] = MFMetrics(
-                        cagr_3y=float(row['CAGR 3Y']) if pd.notna(row['CAGR 3Y']) else 12.0,
-                        expense_ratio=float(row['Expense Ratio']) if pd.notna(row['Expense Ratio']) else 1.5,
-                        volatility=float(row['Volatility']) if pd.notna(row['Volatility']) else 15.0,
-                        sharpe_ratio=float(row['Sharpe Ratio']) if pd.notna(row['Sharpe Ratio']) else 1.0,
-                        alpha=float(row['Alpha']) if pd.notna(row['Alpha']) else 0.0,
-                        sortino_ratio=float(row['Sortino Ratio']) if pd.notna(row['Sortino Ratio']) else 1.2,
-                        tracking_error=float(row['Tracking Error']) if pd.notna(row['Tracking Error']) else 3.0,
-                        time_since_inception=float(row['Time since inception']) if pd.notna(row['Time since inception']) else 24.0,
-                        sebi_risk_category=sebi_risk_category
-                    )
-                except Exception as e:
-                    print(f"Error processing MF row for {mf_name}: {str(e)}")
-                    continue
-        else:
-            print(f"Warning: Mutual Fund screener CSV not found at {mf_csv_path}")
-            self._initialize_sample_mf_data()
-
-    def _initialize_sample_stock_data(self):
-        """Fallback method to initialize sample stock data"""
-        stock_samples = ["Reliance Industries Ltd", "Tata Consultancy Services Ltd", "HDFC Bank Ltd", 
-                        "Infosys Ltd", "ITC Ltd", "Wipro Ltd", "Bajaj Finance Ltd", "HCL Technologies Ltd"]
-        for stock in stock_samples:
-            self.stock_metrics[stock] = StockMetrics(
-                pe_ratio=random.uniform(10, 50),
-                rsi_14d=random.uniform(20, 80),
-                pledged_promoter_holdings=random.uniform(0, 30),
-                promoter_holding=random.uniform(30, 80),
-                beta=random.uniform(0.3, 2.5),
-                six_month_return_vs_nifty=random.uniform(-25, 35),
-                five_year_cagr=random.uniform(5, 30),
-                debt_to_equity=random.uniform(0, 2.0),
-                roce=random.uniform(5, 30),
-                return_on_equity=random.uniform(5, 35),
-                dividend_yield=random.uniform(0, 8),
-                free_cash_flow=random.uniform(-500, 5000)
-            )
-
-    def _initialize_sample_mf_data(self):
-        """Initialize sample mutual fund data"""
-        mf_samples = ["HDFC_FLEXICAP", "AXIS_BLUECHIP", "SBI_SMALLCAP", "ICICI_BALANCED", "HDFC_DEBT"]
-        for mf in mf_samples:
-            self.mf_metrics[mf] = MFMetrics(
-                cagr_3y=random.uniform(6, 20),
-                expense_ratio=random.uniform(0.5, 2.5),
-                volatility=random.uniform(8, 25),
-                sharpe_ratio=random.uniform(0.2, 2.0),
-                alpha=random.uniform(-5, 8),
-                sortino_ratio=random.uniform(0.5, 2.5),
-                tracking_error=random.uniform(1, 8),
-                time_since_inception=random.randint(12, 180),
-                sebi_risk_category=random.choice(list(SEBIRiskCategory))
-            )
+        self.snapshot = load_screener_snapshot()
 
     def calculate_total_aum(self, mf_map: Dict, stock_map: Dict, bank_balances: Dict) -> float:
         """Calculate total Assets Under Management using actual net worth values"""
@@ -197,208 +106,304 @@ class SmartLiquidityEngine:
             
         return 0.08  # Default to 8%
 
+    @staticmethod
+    def bank_excess(total_bank_balance: float, total_aum: float, target_bank_percentage: float) -> float:
+        """Bank balance above the target share of net worth, the only part Step 1 sells"""
+        if total_aum > 0 and total_bank_balance / total_aum > target_bank_percentage:
+            return total_bank_balance - total_aum * target_bank_percentage
+        return 0.0
+
+    def _liquidate_bank(self, liquidation: Dict, bank_balances: Dict, total_aum: float,
+                        target_bank_percentage: float, amount: float) -> Dict[str, float]:
+        """
+        Step 1: sell excess bank balance towards `amount`, split across members by balance
+
+        Adds a Bank entry per member to `liquidation` and returns the rupees
+        taken from each member's balance.
+        """
+        total_bank_balance = sum(bank_balances.values())
+        bank_liquidation_amount = min(self.bank_excess(total_bank_balance, total_aum, target_bank_percentage), amount)
+        sold = {}
+        if bank_liquidation_amount <= 0:
+            return sold
+        current_bank_percentage = total_bank_balance / total_aum
+        for member, balance in bank_balances.items():
+            if balance <= 0:
+                continue
+            # This member's share of the total balance, never more than they hold
+            member_liquidation = min(balance / total_bank_balance * bank_liquidation_amount, balance)
+            if member_liquidation > 0:
+                liquidation.setdefault(member, {}).setdefault("Bank", []).append({
+                    "name": "Bank",
+                    "value_to_sell": round(member_liquidation, 2),
+                    "reason": f'Bank balance ({current_bank_percentage*100:.1f}%) exceeds target ({target_bank_percentage*100:.1f}%)'
+                })
+                sold[member] = member_liquidation
+        return sold
+
+    def _sell_asset(self, liquidation: Dict, asset: Dict, amount_from_asset: float, holdings: Optional[Dict],
+                    units_held: Optional[float] = None, sell_all: bool = False) -> Tuple[float, float]:
+        """
+        Add the sale of `amount_from_asset` rupees of an asset to `liquidation`
+
+        With valued holdings (quantity inputs) the sale is rounded up to whole
+        shares / valid MF units of the `units_held` (default: the whole
+        holding), or is every unit held with sell_all. Returns the units
+        (0 for rupee inputs) and rupees actually sold.
+        """
+        entry = {"name": asset['asset_id']}
+        if holdings is not None:
+            valued = holdings[asset['type']]
+            price = valued.prices[asset['member']][asset['asset_id']]
+            if units_held is None:
+                units_held = valued.quantities[asset['member']][asset['asset_id']]
+            quantity = (units_held if sell_all else
+                        round_sale_quantity(amount_from_asset, price, units_held, UNIT_DECIMALS[asset['type']]))
+            rupees = quantity * price
+            if quantity <= 0:
+                return quantity, rupees
+            entry["quantity_to_sell"] = quantity
+        else:
+            quantity, rupees = 0.0, amount_from_asset
+            if round(amount_from_asset, 2) <= 0:
+                return quantity, rupees
+        entry["value_to_sell"] = round(rupees, 2)
+        entry["reason"] = self._sell_reason(asset['type'], asset['row'], asset['reason_mask'], asset['score'])
+        asset_type = "Stock" if asset['type'] == 'stock' else "MF"
+        liquidation.setdefault(asset['member'], {}).setdefault(asset_type, []).append(entry)
+        return quantity, rupees
+
     def score_stock_for_sale(self, stock_name: str, purpose: Purpose, 
                            timeline: Timeline) -> float:
         """Score a stock for sale priority (higher score = sell first)"""
-        if stock_name not in self.stock_metrics:
-            return 0.0
-            
-        metrics = self.stock_metrics[stock_name]
-        score = 0.0
-        
-        # High priority sell indicators based on new parameters
-        if metrics.pe_ratio > 40:  # Overvalued
-            score += 25
-        if metrics.rsi_14d > 70:  # Overbought
-            score += 30
-        if metrics.pledged_promoter_holdings > 20:  # High pledged holdings
-            score += 30
-        if metrics.promoter_holding < 40:  # Low promoter holding
-            score += 20
-        if metrics.beta > 1.8:  # High volatility
-            score += 15
-        if metrics.six_month_return_vs_nifty < -15:  # Poor recent performance
-            score += 25
-        if metrics.five_year_cagr < 8:  # Poor long-term performance
-            score += 20
-        if metrics.debt_to_equity > 1.5:  # High debt
-            score += 15
-        if metrics.roce < 10:  # Poor capital efficiency
-            score += 15
-        if metrics.return_on_equity < 10:  # Poor equity returns
-            score += 15
-        if metrics.free_cash_flow < 0:  # Negative cash flow
-            score += 20
-        
-        # Purpose-specific scoring
-        if purpose == Purpose.EMERGENCY:
-            if metrics.beta > 1.5:  # Sell high-risk assets first
-                score += 25
-            if metrics.dividend_yield < 1:  # Prefer to keep dividend-paying stocks
-                score += 10
-        elif purpose == Purpose.PLANNED_PURCHASE:
-            if metrics.five_year_cagr < 12:  # Sell low long-term performers
-                score += 20
-        
-        # High dividend yield assets (for income generation)
-        if metrics.dividend_yield > 4:
-            score -= 15
-            
-        return max(0, score)
+        return self.stock_scores.score(stock_name, purpose, timeline)
 
     def score_mf_for_sale(self, mf_id: str, purpose: Purpose, 
                          timeline: Timeline) -> float:
         """Score a mutual fund for sale priority (higher score = sell first)"""
-        if mf_id not in self.mf_metrics:
-            return 0.0
-            
-        metrics = self.mf_metrics[mf_id]
-        score = 0.0
-        
-        # High priority sell indicators for MFs based on new parameters
-        if metrics.cagr_3y < 10:  # Poor 3Y performance
-            score += 25
-        if metrics.expense_ratio > 2.0:  # High expense ratio
-            score += 20
-        if metrics.volatility > 20:  # High volatility
-            score += 15
-        if metrics.sharpe_ratio < 0.5:  # Poor risk-adjusted returns
-            score += 20
-        if metrics.alpha < -2:  # Negative alpha (underperforming benchmark)
-            score += 25
-        if metrics.sortino_ratio < 0.8:  # Poor downside risk management
-            score += 15
-        if metrics.tracking_error > 6:  # High tracking error
-            score += 15
-        if metrics.time_since_inception < 24:  # Very new fund
-            score += 10
-        
-        # SEBI Risk Category scoring
-        risk_scores = {
-            SEBIRiskCategory.VERY_HIGH: 20,
-            SEBIRiskCategory.HIGH: 15,
-            SEBIRiskCategory.MODERATELY_HIGH: 10,
-            SEBIRiskCategory.MODERATE: 5,
-            SEBIRiskCategory.MODERATELY_LOW: 0,
-            SEBIRiskCategory.LOW: -5
+        return self.mf_scores.score(mf_id, purpose, timeline)
+
+    @staticmethod
+    def parse_purpose_timeline(question_answers: Dict) -> Tuple[Purpose, Timeline]:
+        """Purpose and timeline from questionnaire answers (unknown timelines mean no urgency)"""
+        purpose = Purpose(question_answers.get('purpose', 'other'))
+        timeline = TIMELINE_ANSWERS.get(question_answers.get('timeline', 'no_timeline'), Timeline.NO_URGENCY)
+        return purpose, timeline
+
+    def score_instruments(self, stock_names: List[str], mf_names: List[str],
+                          purpose: Purpose, timeline: Timeline) -> Dict:
+        """
+        Score many instruments for sale priority without running a liquidation
+
+        Returns per asset class, in input order, each instrument's score and
+        the sell reasons it triggers; instruments missing from the screener
+        are reported with found = False and a score of 0.
+        """
+        return {
+            'stocks': self._score_batch(self.stock_scores, stock_names, purpose, timeline),
+            'mutual_funds': self._score_batch(self.mf_scores, mf_names, purpose, timeline),
         }
-        score += risk_scores.get(metrics.sebi_risk_category, 0)
-        
-        # Purpose-specific scoring
-        if purpose == Purpose.EMERGENCY:
-            if metrics.sebi_risk_category in [SEBIRiskCategory.HIGH, SEBIRiskCategory.VERY_HIGH]:
-                score += 25  # Sell high-risk funds first
-            if metrics.volatility > 15:
-                score += 20
-        elif purpose == Purpose.PLANNED_PURCHASE:
-            if metrics.cagr_3y < 12:  # Sell underperformers
-                score += 15
-        
-        return max(0, score)
+
+    def _score_batch(self, table: ScoreTable, names: List[str], purpose: Purpose, timeline: Timeline) -> List[Dict]:
+        rows = table.rows(names)
+        scores = table.scores_at(rows, purpose, timeline)
+        reason_masks = table.reason_masks_at(rows)
+        return [
+            {
+                'name': name,
+                'found': row >= 0,
+                'score': score,
+                'reasons': table.reason_labels(reason_mask)
+            }
+            for name, row, score, reason_mask in zip(names, rows.tolist(), scores.tolist(), reason_masks.tolist())
+        ]
+
+    def score_holdings(self, mf_map: Dict, stock_map: Dict, purpose: Optional[Purpose] = None) -> RankedHoldings:
+        """
+        Every holding's score-table row, scores and sell reasons, plus the sale order for `purpose`
+
+        Holdings are stocks then mutual funds, member by member, in input
+        order. The pass runs once per request and purpose, through the
+        coalescer if there is one. Without a purpose, any ranking already
+        made for these holdings is reused (scores cover every purpose).
+        """
+        for ranked_mf_map, ranked_stock_map, ranked_purpose, ranked in self._rankings:
+            if ranked_mf_map is mf_map and ranked_stock_map is stock_map and purpose in (None, ranked_purpose):
+                return ranked
+        purpose = purpose or Purpose.OTHER
+        lookups = [(self.stock_scores, list(stocks)) for stocks in stock_map.values()]
+        lookups += [(self.mf_scores, list(mfs)) for mfs in mf_map.values()]
+        if self.coalescer is not None:
+            ranked = self.coalescer.rank(lookups, purpose)
+        else:
+            ranked = rank_holdings([(lookups, purpose)])[0]
+        self._rankings.append((mf_map, stock_map, purpose, ranked))
+        return ranked
+
+    @staticmethod
+    def _holdings(mf_map: Dict, stock_map: Dict) -> List[Tuple[str, str, str, float]]:
+        """(member, type, name, value) of every holding, in score_holdings order"""
+        holdings = [(member, 'stock', name, value) for member, stocks in stock_map.items()
+                    for name, value in stocks.items()]
+        holdings += [(member, 'mf', name, value) for member, mfs in mf_map.items() for name, value in mfs.items()]
+        return holdings
+
+    def rank_assets(self, mf_map: Dict, stock_map: Dict, purpose: Purpose, timeline: Timeline,
+                    priority_members: List[str]) -> List[Dict]:
+        """Score every sellable holding, sorted by score (highest first - most suitable to sell)"""
+        ranked = self.score_holdings(mf_map, stock_map, purpose)
+        holdings = self._holdings(mf_map, stock_map)
+        rows, reason_masks = ranked.rows.tolist(), ranked.reason_masks.tolist()
+        scores = ranked.scores[:, PURPOSES.index(purpose)].tolist()
+        all_assets = []
+        for position in ranked.sale_order.tolist():
+            member, asset_type, name, net_worth = holdings[position]
+            # Skip members whose holdings should be retained, and funds missing from the screener
+            if member in priority_members or (asset_type == 'mf' and rows[position] < 0):
+                continue
+            all_assets.append({
+                'member': member,
+                'asset_id': name,
+                'type': asset_type,
+                'score': scores[position],
+                'row': rows[position],
+                'reason_mask': reason_masks[position],
+                'estimated_value': net_worth
+            })
+        return all_assets
+
+    def plan_sales(self, assets: List[Dict], amount: float, solver: str = 'greedy') -> Tuple[List[Tuple[Dict, float]], Optional[Dict]]:
+        """
+        Decide how much of each asset to sell to raise `amount`
+
+        Assets must be sorted by score, highest first. The greedy plan sells
+        them in that order. With solver='exact', sales minimise the retention
+        value lost (see solver.solve_liquidation) within the time budget, and
+        fall back to greedy if no plan is found. Returns (asset, amount) pairs
+        in asset order plus the solver status (None for greedy).
+        """
+        if solver != 'exact' or not assets:
+            return self._plan_greedy_sales(assets, amount), None
+        try:
+            plan = solve_liquidation(
+                np.array([asset['estimated_value'] for asset in assets], dtype=np.float64),
+                np.array([asset['score'] for asset in assets], dtype=np.float64),
+                amount, self.solver_time_budget
+            )
+        except Exception as e:
+            print(f"Error in exact liquidation solver, using greedy plan: {str(e)}")
+            plan = None
+        if plan is None:
+            return self._plan_greedy_sales(assets, amount), {'mode': 'exact', 'status': 'fallback'}
+        sales = [(asset, amount_from_asset) for asset, amount_from_asset in zip(assets, plan.amounts.tolist())
+                 if amount_from_asset > 0]
+        return sales, {
+            'mode': 'exact',
+            'status': 'optimal' if plan.optimal else 'time_limit',
+            'retention_value_lost': round(plan.cost, 2)
+        }
+
+    def plan_tax_aware_sales(self, assets: List[Dict], amount: float,
+                             holding_details: Dict) -> List[Tuple[Dict, float]]:
+        """
+        Sell assets so that proceeds net of capital gains tax raise `amount`
+
+        Each asset's score is lowered by its tax drag (see tax.TAX_DRAG_WEIGHT),
+        so holdings with large short-term gains are sold later, and the sales
+        are grossed up for the tax they trigger. The LTCG exemption left per
+        member comes from self.tax_slab_exhausted. Returns (asset, amount)
+        pairs in sale order; tax_summary() gives the tax of the final sales.
+        """
+        profile = tax_profile(assets, holding_details, self.tax_slab_exhausted)
+        scores = np.array([asset['score'] for asset in assets], dtype=np.float64)
+        order = np.argsort(-(scores - TAX_DRAG_WEIGHT * tax_drag(profile)), kind='stable')
+        assets = [assets[i] for i in order.tolist()]
+        values = np.array([asset['estimated_value'] for asset in assets], dtype=np.float64)
+        amounts, _ = gross_up_sales(values, profile.take(order), amount)
+        return [(asset, amount_from_asset) for asset, amount_from_asset in zip(assets, amounts.tolist())
+                if amount_from_asset > 0]
+
+    def tax_summary(self, sales: List[Tuple[Dict, float]], holding_details: Dict) -> TaxSummary:
+        """Capital gains tax of (asset, rupees sold) pairs, e.g. after rounding to whole shares"""
+        assets = [asset for asset, _ in sales]
+        amounts = np.array([amount_from_asset for _, amount_from_asset in sales], dtype=np.float64)
+        return capital_gains_tax(tax_profile(assets, holding_details, self.tax_slab_exhausted), amounts)
+
+    def _plan_greedy_sales(self, assets: List[Dict], amount: float) -> List[Tuple[Dict, float]]:
+        """Sell assets in order until the amount is raised, the last one partially"""
+        sales = []
+        remaining_amount = amount
+        for asset in assets:
+            if remaining_amount <= 0:
+                break
+            amount_from_asset = min(asset['estimated_value'], remaining_amount)
+            sales.append((asset, amount_from_asset))
+            remaining_amount -= amount_from_asset
+        return sales
 
     def identify_poor_performers(self, mf_map: Dict, stock_map: Dict) -> Tuple[Dict, float]:
         """Identify additional poor performing assets for reinvestment suggestions"""
         poor_assets = {}
         total_poor_value = 0
+        # Rows, scores and reasons come from the request's ranking pass
+        ranked = self.score_holdings(mf_map, stock_map)
+        rows, reason_masks = ranked.rows.tolist(), ranked.reason_masks.tolist()
+        scores = ranked.scores[:, PURPOSES.index(Purpose.OTHER)].tolist()
+        position = 0
         
         # Check stocks for poor performance
         for member, stocks in stock_map.items():
             poor_assets[member] = []
             for stock_name, net_worth in stocks.items():
-                if stock_name in self.stock_metrics:
-                    metrics = self.stock_metrics[stock_name]
-                    score = self.score_stock_for_sale(stock_name, Purpose.OTHER, Timeline.NO_URGENCY)
-                    
-                    # Consider it poor if score is high
-                    if score > 35:
-                        poor_assets[member].append({
-                            'asset_id': stock_name,
-                            'type': 'stock',
-                            'estimated_value': net_worth,  # Use actual net worth
-                            'issues': self._get_stock_sell_reason(stock_name, score),
-                            'recommendation': 'Consider switching to fundamentally stronger stocks'
-                        })
-                        total_poor_value += net_worth
+                row, score, reason_mask = rows[position], scores[position], reason_masks[position]
+                position += 1
+                # Consider it poor if score is high
+                if row >= 0 and score > 35:
+                    poor_assets[member].append({
+                        'asset_id': stock_name,
+                        'type': 'stock',
+                        'estimated_value': net_worth,  # Use actual net worth
+                        'issues': self._sell_reason('stock', row, reason_mask, score),
+                        'recommendation': 'Consider switching to fundamentally stronger stocks'
+                    })
+                    total_poor_value += net_worth
         
         # Check MFs for poor performance
         for member, mfs in mf_map.items():
             if member not in poor_assets:
                 poor_assets[member] = []
             for mf_name, net_worth in mfs.items():
-                if mf_name in self.mf_metrics:
-                    metrics = self.mf_metrics[mf_name]
-                    score = self.score_mf_for_sale(mf_name, Purpose.OTHER, Timeline.NO_URGENCY)
-                    
-                    # Consider it poor if score is high
-                    if score > 30:
-                        poor_assets[member].append({
-                            'asset_id': mf_name,
-                            'type': 'mf',
-                            'estimated_value': net_worth,
-                            'issues': self._get_mf_sell_reason(mf_name, score),
-                            'recommendation': 'Consider switching to better performing funds with lower costs'
-                        })
-                        total_poor_value += net_worth
+                row, score, reason_mask = rows[position], scores[position], reason_masks[position]
+                position += 1
+                # Consider it poor if score is high
+                if row >= 0 and score > 30:
+                    poor_assets[member].append({
+                        'asset_id': mf_name,
+                        'type': 'mf',
+                        'estimated_value': net_worth,
+                        'issues': self._sell_reason('mf', row, reason_mask, score),
+                        'recommendation': 'Consider switching to better performing funds with lower costs'
+                    })
+                    total_poor_value += net_worth
         
         return poor_assets, total_poor_value
 
     def _get_stock_sell_reason(self, stock_name: str, score: float) -> str:
         """Generate reason for selling a stock"""
-        if stock_name not in self.stock_metrics:
-            return "Stock metrics not available"
-            
-        metrics = self.stock_metrics[stock_name]
-        reasons = []
-        
-        if metrics.pe_ratio > 40:
-            reasons.append("Overvalued (PE > 40)")
-        if metrics.rsi_14d > 70:
-            reasons.append("Overbought (RSI > 70)")
-        if metrics.pledged_promoter_holdings > 20:
-            reasons.append("High pledged holdings")
-        if metrics.promoter_holding < 40:
-            reasons.append("Low promoter holding")
-        if metrics.six_month_return_vs_nifty < -15:
-            reasons.append("Poor recent performance")
-        if metrics.five_year_cagr < 8:
-            reasons.append("Poor long-term returns")
-        if metrics.debt_to_equity > 1.5:
-            reasons.append("High debt levels")
-        if metrics.roce < 10:
-            reasons.append("Low ROCE")
-        if metrics.return_on_equity < 10:
-            reasons.append("Low ROE")
-        if metrics.free_cash_flow < 0:
-            reasons.append("Negative free cash flow")
-        
-        return "; ".join(reasons) if reasons else f"Priority score: {score:.1f}"
+        return self._sell_reason('stock', self.stock_scores.index_of(stock_name),
+                                 self.stock_scores.reason_mask(stock_name), score)
     
     def _get_mf_sell_reason(self, mf_id: str, score: float) -> str:
         """Generate reason for selling a mutual fund"""
-        if mf_id not in self.mf_metrics:
-            return "MF metrics not available"
-            
-        metrics = self.mf_metrics[mf_id]
-        reasons = []
-        
-        if metrics.cagr_3y < 10:
-            reasons.append("Poor 3Y CAGR")
-        if metrics.expense_ratio > 2.0:
-            reasons.append("High expense ratio")
-        if metrics.volatility > 20:
-            reasons.append("High volatility")
-        if metrics.sharpe_ratio < 0.5:
-            reasons.append("Poor Sharpe ratio")
-        if metrics.alpha < -2:
-            reasons.append("Negative alpha")
-        if metrics.sortino_ratio < 0.8:
-            reasons.append("Poor Sortino ratio")
-        if metrics.tracking_error > 6:
-            reasons.append("High tracking error")
-        if metrics.sebi_risk_category in [SEBIRiskCategory.HIGH, SEBIRiskCategory.VERY_HIGH]:
-            reasons.append(f"High risk ({metrics.sebi_risk_category.value})")
-        
-        return "; ".join(reasons) if reasons else f"Priority score: {score:.1f}"
+        return self._sell_reason('mf', self.mf_scores.index_of(mf_id),
+                                 self.mf_scores.reason_mask(mf_id), score)
+
+    def _sell_reason(self, asset_type: str, row: int, reason_mask: int, score: float) -> str:
+        """Sell reason text from an asset's triggered-rule bitmask (row -1: not in the screener)"""
+        if row < 0:
+            return "Stock metrics not available" if asset_type == 'stock' else "MF metrics not available"
+        scores = self.stock_scores if asset_type == 'stock' else self.mf_scores
+        return scores.reason_text(reason_mask) or f"Priority score: {score:.1f}"
     
     def _generate_recommendations(self, purpose: Purpose, timeline: Timeline, 
                                 has_goals: bool, income_change: str, liquidation_percentage: float) -> List[str]:
@@ -428,6 +433,117 @@ class SmartLiquidityEngine:
         
         return recommendations
 
+    def _value_holdings(self, mf_map: Dict, stock_map: Dict, question_answers: Dict) -> Tuple[Dict, Dict, Optional[Dict]]:
+        """Rupee-valued (mf_map, stock_map) plus the valued holdings by asset type (None for rupee inputs)"""
+        if question_answers.get('holdings_unit', 'value') != 'quantity':
+            return mf_map, stock_map, None
+        holdings = {
+            'stock': value_holdings(stock_map, self.stock_scores, 'close_price'),
+            'mf': value_holdings(mf_map, self.mf_scores, 'nav')
+        }
+        return holdings['mf'].values, holdings['stock'].values, holdings
+
+    def build_plan_frontier(self, mf_map: Dict, stock_map: Dict,
+                            bank_balances: Dict, question_answers: Dict) -> PlanFrontier:
+        """
+        Greedy liquidation plans of one household for any amount needed
+
+        Scores, sale order and the bank target do not depend on the amount,
+        so they are computed once and every what-if amount is a binary
+        search on the frontier; question_answers['amount_needed'] is ignored.
+        """
+        if self.snapshot is None:
+            self.load_asset_data()
+        purpose, timeline = self.parse_purpose_timeline(question_answers)
+        mf_map, stock_map, _ = self._value_holdings(mf_map, stock_map, question_answers)
+        total_aum = self.calculate_total_aum(mf_map, stock_map, bank_balances)
+        
+        # Same rule as Step 1: only the balance above the target share is sold
+        bank_excess = self.bank_excess(sum(bank_balances.values()), total_aum,
+                                       self.get_target_bank_percentage(purpose, timeline))
+        
+        assets = self.rank_assets(mf_map, stock_map, purpose, timeline,
+                                  question_answers.get('priority_members', []))
+        return PlanFrontier(assets, bank_excess, total_aum)
+
+    def plan_schedule(self, assets: List[Dict], bank_balances: Dict, total_aum: float, purpose: Purpose,
+                      timeline: Timeline, amount: float, periods: int,
+                      holdings: Optional[Dict] = None) -> List[Dict]:
+        """
+        Liquidation schedule for `periods` withdrawals of `amount` each
+
+        Every period starts from the previous period's residual portfolio:
+        scores do not change between periods, so the sale order continues
+        where the previous period stopped, and the bank target is re-applied
+        to the shrunken net worth. Each period only touches the assets it
+        sells, so a long schedule costs little more than a single plan.
+        Assets must be sorted by score, highest first. With valued holdings
+        (quantity inputs), sales are rounded like the primary plan's and the
+        units left in an asset carry over to the next period.
+        """
+        target_bank_percentage = self.get_target_bank_percentage(purpose, timeline)
+        bank_left = {member: balance for member, balance in bank_balances.items() if balance > 0}
+        aum = total_aum
+
+        def holding_left(index: int) -> Tuple[float, float]:
+            """Rupees and units (quantity inputs only) of an untouched asset"""
+            if index >= len(assets):
+                return 0.0, 0.0
+            asset = assets[index]
+            if holdings is None:
+                return asset['estimated_value'], 0.0
+            return asset['estimated_value'], holdings[asset['type']].quantities[asset['member']][asset['asset_id']]
+
+        cursor = 0
+        left_in_asset, units_left = holding_left(cursor)
+        schedule = []
+        for period in range(1, periods + 1):
+            # Same cap as a one-time request, against the residual net worth
+            if aum <= 0 or amount / aum > MAX_LIQUIDATION_FRACTION:
+                schedule.append({
+                    "period": period,
+                    "status": "REJECTED",
+                    "message": f'Remaining net worth (₹{max(aum, 0):,.0f}) cannot support another withdrawal of ₹{amount:,.0f}'
+                })
+                break
+            liquidation = {}
+            remaining_amount = amount
+            proceeds = 0.0
+            
+            # Bank balance above the target share of the residual net worth
+            for member, member_liquidation in self._liquidate_bank(
+                    liquidation, bank_left, aum, target_bank_percentage, remaining_amount).items():
+                bank_left[member] -= member_liquidation
+                remaining_amount -= member_liquidation
+                proceeds += member_liquidation
+            
+            # Continue down the sale order from the previous period's last asset
+            while remaining_amount > 0 and cursor < len(assets):
+                asset = assets[cursor]
+                amount_from_asset = min(left_in_asset, remaining_amount)
+                remaining_amount -= amount_from_asset
+                # With valued holdings, what is left is sold as held once the amount covers it
+                quantity, rupees = self._sell_asset(liquidation, asset, amount_from_asset, holdings,
+                                                    units_left, sell_all=amount_from_asset >= left_in_asset)
+                proceeds += rupees
+                if holdings is not None:
+                    units_left = round(units_left - quantity, _UNITS_LEFT_DECIMALS)
+                    left_in_asset = units_left * holdings[asset['type']].prices[asset['member']][asset['asset_id']]
+                else:
+                    left_in_asset -= amount_from_asset
+                if left_in_asset <= 0:
+                    cursor += 1
+                    left_in_asset, units_left = holding_left(cursor)
+            
+            aum -= proceeds
+            schedule.append({
+                "period": period,
+                "status": "OK",
+                "liquidation": liquidation,
+                "shortfall": round(max(remaining_amount, 0), 2)
+            })
+        return schedule
+
     def optimize_liquidation(self, mf_map: Dict, stock_map: Dict, 
                            bank_balances: Dict, question_answers: Dict) -> Dict:
         """
@@ -436,6 +552,7 @@ class SmartLiquidityEngine:
         Inputs:
         - mf_map: {family_member: {mf_name: net_worth}}
         - stock_map: {family_member: {stock_name: net_worth}}
+          (units / shares held when question_answers['holdings_unit'] is 'quantity')
         - bank_balances: {family_member: float}
         - question_answers: dict with user responses
         
@@ -443,38 +560,41 @@ class SmartLiquidityEngine:
         - dict: {family_member: [{asset_id: percentage_to_sell}]} or error message
         """
         
-        # Initialize sample data for demonstration
-        self.load_asset_data()
+        # Screener data comes from the shared snapshot (loaded lazily if absent)
+        if self.snapshot is None:
+            self.load_asset_data()
         
         # Parse user inputs
-        purpose = Purpose(question_answers.get('purpose', 'other'))
-        timeline_map = {
-            'today': Timeline.IMMEDIATE,
-            '2-3_days': Timeline.IMMEDIATE,
-            'within_week': Timeline.WITHIN_WEEK,
-            '1-4_weeks': Timeline.ONE_TO_FOUR_WEEKS,
-            'no_timeline': Timeline.NO_URGENCY
-        }
-        timeline = timeline_map.get(question_answers.get('timeline', 'no_timeline'), Timeline.NO_URGENCY)
+        purpose, timeline = self.parse_purpose_timeline(question_answers)
         amount_needed = float(question_answers.get('amount_needed', 0))
         recurring_need = question_answers.get('recurring_need', 'one_time') != 'one_time'
         has_goals = question_answers.get('has_goals', 'no') == 'yes'
         income_change = question_answers.get('income_change', 'no_change')
         priority_members = question_answers.get('priority_members', [])
+        # LTCG exemption each member has already used this financial year
+        self.tax_slab_exhausted = question_answers.get('ltcg_exemption_used', {})
+        
+        # Quantities are valued at snapshot prices; sales are then rounded to
+        # whole shares / valid MF units
+        mf_map, stock_map, holdings = self._value_holdings(mf_map, stock_map, question_answers)
         
         # Calculate total AUM
         total_aum = self.calculate_total_aum(mf_map, stock_map, bank_balances)
         
         # CHECK 1: If liquidation amount is > 80% of net worth, reject
         liquidation_percentage = amount_needed / total_aum  # Keep as decimal
-        if liquidation_percentage > 0.8:  # 80%
+        if liquidation_percentage > MAX_LIQUIDATION_FRACTION:
             return {
                 'status': 'REJECTED',
                 'message': f'Cannot process liquidation request. You are asking to liquidate {liquidation_percentage*100:.1f}% of your total net worth (₹{amount_needed:,.0f} out of ₹{total_aum:,.0f}). This would severely impact your financial stability.',
                 'recommendation': 'Consider alternative funding sources like loans, or reduce the required amount.',
-                'max_safe_liquidation': f'₹{total_aum * 0.8:,.0f} (80% of net worth)'
+                'max_safe_liquidation': f'₹{total_aum * MAX_LIQUIDATION_FRACTION:,.0f} ({MAX_LIQUIDATION_FRACTION:.0%} of net worth)'
             }
         
+        # One scoring pass for the whole request, shared by every step below
+        # (batched with concurrent requests when there is a coalescer)
+        self.score_holdings(mf_map, stock_map, purpose)
+        
         # Initialize response structure
         response = {
             "primary_liquidation": {},
@@ -483,121 +603,47 @@ class SmartLiquidityEngine:
         }
         
         remaining_amount = amount_needed
+        all_assets = None
         
-        # Step 1: Bank balance optimization
+        # Step 1: Bank balance optimization - only the balance above the target share is sold
         target_bank_percentage = self.get_target_bank_percentage(purpose, timeline)
-        total_bank_balance = sum(bank_balances.values())
-        current_bank_percentage = total_bank_balance / total_aum  # Keep as decimal
-        target_bank_balance = total_aum * target_bank_percentage
-        
-        # Only liquidate bank funds if current percentage exceeds target percentage
-        bank_liquidation_amount = 0
-        if current_bank_percentage > target_bank_percentage:
-            # Calculate excess bank balance that can be liquidated
-            excess_bank_balance = total_bank_balance - target_bank_balance
-            bank_liquidation_amount = min(excess_bank_balance, remaining_amount)
-        else:
-            # Bank balance is below or at target - don't liquidate any bank funds
-            bank_liquidation_amount = 0
-        
-        if bank_liquidation_amount > 0:
-            # Distribute bank liquidation proportionally across members
-            for member, balance in bank_balances.items():
-                if balance > 0 and bank_liquidation_amount > 0:
-                    # Calculate this member's proportion of total bank balance
-                    member_proportion = balance / total_bank_balance
-                    member_liquidation = member_proportion * bank_liquidation_amount
-                    
-                    # Ensure we don't liquidate more than the member's balance
-                    member_liquidation = min(member_liquidation, balance)
-                    
-                    # Only add if there's a positive value to liquidate
-                    if member_liquidation > 0:
-                        if member not in response["primary_liquidation"]:
-                            response["primary_liquidation"][member] = {}
-                        if "Bank" not in response["primary_liquidation"][member]:
-                            response["primary_liquidation"][member]["Bank"] = []
-                        response["primary_liquidation"][member]["Bank"].append({
-                            "name": "Bank",
-                            "value_to_sell": round(member_liquidation, 2),
-                            "reason": f'Bank balance ({current_bank_percentage*100:.1f}%) exceeds target ({target_bank_percentage*100:.1f}%)'
-                        })
-                        remaining_amount -= member_liquidation
+        for member_liquidation in self._liquidate_bank(response["primary_liquidation"], bank_balances, total_aum,
+                                                       target_bank_percentage, remaining_amount).values():
+            remaining_amount -= member_liquidation
         
         # Step 2: If more money needed, sell assets
         if remaining_amount > 0:
-            # Create list of all assets with scores
-            all_assets = []
-            
-            # Score all stocks
-            for member, stocks in stock_map.items():
-                # Skip if member should be prioritized to retain
-                if member in priority_members:
-                    continue
-                    
-                for stock_name, net_worth in stocks.items():
-                    score = self.score_stock_for_sale(stock_name, purpose, timeline)
-                    all_assets.append({
-                        'member': member,
-                        'asset_id': stock_name,
-                        'type': 'stock',
-                        'score': score,
-                        'estimated_value': net_worth
-                    })
-            
-            # Score all MFs
-            for member, mfs in mf_map.items():
-                # Skip if member should be prioritized to retain
-                if member in priority_members:
-                    continue
-                    
-                for mf_name, net_worth in mfs.items():
-                    score = self.score_mf_for_sale(mf_name, purpose, timeline)
-                    if mf_name in self.mf_metrics:
-                        all_assets.append({
-                            'member': member,
-                            'asset_id': mf_name,
-                            'type': 'mf',
-                            'score': score,
-                            'estimated_value': net_worth
-                        })
-            
-            # Sort by score (highest first - most suitable to sell)
-            all_assets.sort(key=lambda x: x['score'], reverse=True)
+            # Score all assets, highest first - most suitable to sell
+            all_assets = self.rank_assets(mf_map, stock_map, purpose, timeline, priority_members)
             
             # Select assets to sell
-            for asset in all_assets:
-                if remaining_amount <= 0:
-                    break
-                    
-                member = asset['member']
-                asset_id = asset['asset_id']
-                estimated_value = asset['estimated_value']
-                
-                # Calculate percentage to sell
-                if remaining_amount >= estimated_value:
-                    percentage_to_sell = 1.0  # 100%
-                    amount_from_asset = estimated_value
-                else:
-                    percentage_to_sell = remaining_amount / estimated_value  # Keep as decimal
-                    amount_from_asset = remaining_amount
-                
-                # Add to response
-                if member not in response["primary_liquidation"]:
-                    response["primary_liquidation"][member] = {}
-                
-                asset_type = "Stock" if asset['type'] == 'stock' else "MF"
-                if asset_type not in response["primary_liquidation"][member]:
-                    response["primary_liquidation"][member][asset_type] = []
-                
-                if round(amount_from_asset, 2) > 0:
-                    response["primary_liquidation"][member][asset_type].append({
-                        "name": asset_id,
-                        "value_to_sell": round(amount_from_asset, 2),
-                        "reason": self._get_stock_sell_reason(asset_id, asset['score']) if asset['type'] == 'stock' else self._get_mf_sell_reason(asset_id, asset['score'])
-                    })
-                
+            tax_aware = question_answers.get('tax_aware', False)
+            if tax_aware:
+                sales = self.plan_tax_aware_sales(
+                    all_assets, remaining_amount, question_answers.get('holding_details', {}))
+            else:
+                sales, solver_status = self.plan_sales(all_assets, remaining_amount, question_answers.get('solver', 'greedy'))
+                if solver_status is not None:
+                    response["solver"] = solver_status
+            sold = []  # (asset, rupees) as finally sold, after rounding to whole shares / MF units
+            for asset, amount_from_asset in sales:
+                _, rupees = self._sell_asset(response["primary_liquidation"], asset, amount_from_asset, holdings)
+                if rupees > 0:
+                    sold.append((asset, rupees))
                 remaining_amount -= amount_from_asset
+            
+            if tax_aware:
+                # Tax of the sales as listed above, rounded quantities included
+                tax_summary = self.tax_summary(sold, question_answers.get('holding_details', {}))
+                gross_proceeds = sum(amount_from_asset for _, amount_from_asset in sold)
+                response["tax"] = {
+                    "gross_proceeds": round(gross_proceeds, 2),
+                    "estimated_tax": round(tax_summary.tax, 2),
+                    "net_proceeds": round(gross_proceeds - tax_summary.tax, 2),
+                    "short_term_gain": round(tax_summary.short_term_gain, 2),
+                    "long_term_gain": round(tax_summary.long_term_gain, 2),
+                    "ltcg_exemption_used": round(tax_summary.exemption_used, 2)
+                }
         
         # Step 3: Identify additional poor performers for reinvestment suggestions
         poor_assets, total_poor_value = self.identify_poor_performers(mf_map, stock_map)
@@ -613,11 +659,24 @@ class SmartLiquidityEngine:
                     if asset_type not in response["secondary_liquidation"][member]:
                         response["secondary_liquidation"][member][asset_type] = []
                     
-                    response["secondary_liquidation"][member][asset_type].append({
+                    entry = {
                         "name": asset["asset_id"],
                         "value_to_sell": asset["estimated_value"],
                         "reason": asset["issues"]
-                    })
+                    }
+                    if holdings is not None:
+                        entry["quantity_to_sell"] = holdings[asset["type"]].quantities[member][asset["asset_id"]]
+                        entry["value_to_sell"] = round(asset["estimated_value"], 2)
+                    response["secondary_liquidation"][member][asset_type].append(entry)
+        
+        # Recurring needs: the same withdrawal every period from the residual portfolio
+        if recurring_need:
+            if all_assets is None:
+                all_assets = self.rank_assets(mf_map, stock_map, purpose, timeline, priority_members)
+            response["schedule"] = self.plan_schedule(
+                all_assets, bank_balances, total_aum, purpose, timeline, amount_needed,
+                int(question_answers.get('recurring_periods', DEFAULT_RECURRING_PERIODS)), holdings
+            )
         
         # Add recommendations
         response["recommendations"] = self._generate_recommendations(
@@ -628,6 +687,15 @@ class SmartLiquidityEngine:
             liquidation_percentage=liquidation_percentage
         )
         
+        if holdings is not None:
+            # Holdings valued at 0 because the screener has no price for them
+            unpriced = {}
+            for asset_type, valued in (("Stock", holdings['stock']), ("MF", holdings['mf'])):
+                for member, names in valued.unpriced.items():
+                    unpriced.setdefault(member, {})[asset_type] = names
+            if unpriced:
+                response["unpriced_holdings"] = unpriced
+        
         return response
 
     def process_user_input(self, combined_json: Dict) -> Dict:
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import operator
+import os
+import sys
+import numpy as np
+from dataclasses import fields
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from ..models.enums import Purpose, Timeline, SEBIRiskCategory
+from ..models.metrics import StockMetrics, MFMetrics
+from .cohorts import peer_feature_default, peer_feature_names
+from .ingest import MF_SCHEMA, SEBI_CATEGORIES, STOCK_SCHEMA, ScreenerSchema
+from .store import MetricStore
+
+PURPOSES = list(Purpose)
+_PURPOSE_INDEX = {purpose: i for i, purpose in enumerate(PURPOSES)}
+
+# Triggered rules are packed into one uint64 per instrument
+MAX_RULES = 64
+
+COMPARATORS = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '==': operator.eq,
+    'in': np.isin,
+}
+
+
+class SellRule(NamedTuple):
+    """One sale-priority rule: `metric comparator threshold` adds weight to the score"""
+    metric: str
+    comparator: str  # key of COMPARATORS
+    threshold: object
+    weight: float
+    purposes: Optional[Tuple[Purpose, ...]] = None  # None applies to every purpose
+    reason: Optional[str] = None  # sell reason reported when triggered; None scores silently
+
+
+class ScoringConfig(NamedTuple):
+    """Versioned sale-priority rule tables for every asset class"""
+    version: str
+    stock_rules: Tuple[SellRule, ...]
+    mf_rules: Tuple[SellRule, ...]
+
+
+# Built-in scoring config, used unless the assets directory has its own scoring_rules.json
+DEFAULT_SCORING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'default_scoring_rules.json')
+
+
+def load_scoring_config(path: str) -> ScoringConfig:
+    """
+    Load and validate a scoring config file
+
+    The file is JSON with a declared "version" and one rule list per asset
+    class ("stock", "mf"); each rule is an object with metric, comparator,
+    threshold, weight and optional purposes / reason. SEBI categories and
+    purposes are given by their enum values. A metric may also be a peer
+    feature such as expense_ratio_peer_pct (see cohorts). The effective version also
+    carries a content hash, so an edit without a version bump still
+    produces a new version.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    config = json.loads(raw)
+    declared = str(config.get('version', 'unversioned'))
+    return ScoringConfig(
+        version=f"{declared}-{hashlib.sha256(raw).hexdigest()[:8]}",
+        stock_rules=_parse_rules(config.get('stock', []), StockMetrics, STOCK_SCHEMA),
+        mf_rules=_parse_rules(config.get('mf', []), MFMetrics, MF_SCHEMA),
+    )
+
+
+def _parse_rules(entries: List[Dict], metrics_cls, schema: ScreenerSchema) -> Tuple[SellRule, ...]:
+    metric_names = {field.name for field in fields(metrics_cls)} | set(peer_feature_names(schema))
+    rules = []
+    for i, entry in enumerate(entries):
+        where = f"{metrics_cls.__name__} rule {i}"
+        metric = entry.get('metric')
+        if metric not in metric_names:
+            raise ValueError(f"{where}: unknown metric {metric!r}")
+        comparator = entry.get('comparator')
+        if comparator not in COMPARATORS:
+            raise ValueError(f"{where}: unknown comparator {comparator!r}")
+        threshold = entry.get('threshold')
+        if metric == 'sebi_risk_category':
+            threshold = (tuple(SEBIRiskCategory(value) for value in threshold) if comparator == 'in'
+                         else SEBIRiskCategory(threshold))
+        elif comparator == 'in':
+            threshold = tuple(float(value) for value in threshold)
+        else:
+            threshold = float(threshold)
+        purposes = entry.get('purposes')
+        rules.append(SellRule(
+            metric=metric,
+            comparator=comparator,
+            threshold=threshold,
+            weight=float(entry['weight']),
+            purposes=tuple(Purpose(value) for value in purposes) if purposes is not None else None,
+            reason=entry.get('reason'),
+        ))
+    if len(rules) > MAX_RULES:
+        raise ValueError(f"At most {MAX_RULES} {metrics_cls.__name__} rules, got {len(rules)}")
+    return tuple(rules)
+
+
+# Rules used when the assets directory has no (valid) scoring config
+DEFAULT_SCORING = load_scoring_config(DEFAULT_SCORING_PATH)._replace(version='builtin')
+STOCK_RULES = DEFAULT_SCORING.stock_rules
+MF_RULES = DEFAULT_SCORING.mf_rules
+
+
+class ScoreTable:
+    """
+    Sale-priority scores and sell reasons for a whole asset class, precomputed per snapshot
+
+    Every rule is evaluated once, column-wise, and the rules an instrument
+    triggers are kept as one integer bitmask per instrument (bit i = rule i).
+    Scores for each purpose are the weighted sum of the triggered rules,
+    kept in a dense (instrument, purpose) table. No rule depends on the
+    timeline, so it is accepted by the lookups but does not index the table.
+    Request-time scoring is then a lookup or an array gather; unknown
+    instruments score 0. Reason text is only built from a mask when a
+    response needs it, and each distinct text is built once per table.
+    """
+
+    def __init__(self, metrics: Mapping, rules: Sequence[SellRule], masks: np.ndarray, scores: np.ndarray):
+        self.metrics = metrics
+        self.rules = tuple(rules)
+        self.masks = masks
+        self.scores = scores
+        self.reason_bits = sum(1 << i for i, rule in enumerate(self.rules) if rule.reason is not None)
+        self._reason_texts = {}
+        # Sample-data fallbacks are plain dicts without a name index
+        self._positions = None if isinstance(metrics, MetricStore) else {name: i for i, name in enumerate(metrics)}
+
+    def index_of(self, name) -> int:
+        if self._positions is None:
+            return self.metrics.index_of(name)
+        return self._positions.get(name, -1)
+
+    def rows(self, names: Iterable[str]) -> np.ndarray:
+        """Row index per name, -1 for instruments not in the table"""
+        if self._positions is None:
+            return self.metrics.rows_of(list(names))
+        return np.fromiter((self._positions.get(name, -1) for name in names), dtype=np.int64)
+
+    def score(self, name: str, purpose: Purpose, timeline: Timeline) -> float:
+        """Sale-priority score of one instrument"""
+        index = self.index_of(name)
+        if index < 0:
+            return 0.0
+        return self.scores.item(index, _PURPOSE_INDEX[purpose])
+
+    def scores_at(self, rows: np.ndarray, purpose: Purpose, timeline: Timeline) -> np.ndarray:
+        scores = self.scores[:, _PURPOSE_INDEX[purpose]]
+        if not len(scores):
+            return np.zeros(len(rows))
+        return np.where(rows >= 0, scores[rows], 0.0)
+
+    def score_rows_at(self, rows: np.ndarray) -> np.ndarray:
+        """Scores for every purpose (columns in PURPOSES order), one row per instrument, 0 for unknown rows"""
+        if not len(self.scores):
+            return np.zeros((len(rows), len(PURPOSES)))
+        return np.where((rows >= 0)[:, None], self.scores[rows], 0.0)
+
+    def reason_masks_at(self, rows: np.ndarray) -> np.ndarray:
+        """Bitmask of the triggered rules that carry a sell reason, 0 for unknown rows"""
+        if not len(self.masks):
+            return np.zeros(len(rows), dtype=np.uint64)
+        return np.where(rows >= 0, self.masks[rows] & np.uint64(self.reason_bits), np.uint64(0))
+
+    def reason_mask(self, name: str) -> int:
+        index = self.index_of(name)
+        return int(self.masks.item(index)) & self.reason_bits if index >= 0 else 0
+
+    def reason_labels(self, mask: int) -> List[str]:
+        """Sell reasons encoded in a reason mask, in rule order"""
+        return [rule.reason for i, rule in enumerate(self.rules) if mask >> i & 1 and rule.reason is not None]
+
+    def reason_text(self, mask: int) -> Optional[str]:
+        """'; '-joined sell reasons for a reason mask, or None if it has none"""
+        mask &= self.reason_bits
+        if not mask:
+            return None
+        text = self._reason_texts.get(mask)
+        if text is None:
+            text = sys.intern("; ".join(rule.reason for i, rule in enumerate(self.rules) if mask >> i & 1))
+            self._reason_texts[mask] = text
+        return text
+
+
+def build_stock_scores(metrics: Mapping, rules: Sequence[SellRule] = STOCK_RULES) -> ScoreTable:
+    """Score every stock for every purpose"""
+    return build_score_table(metrics, _metric_columns(metrics, StockMetrics), rules)
+
+
+def build_mf_scores(metrics: Mapping, rules: Sequence[SellRule] = MF_RULES) -> ScoreTable:
+    """Score every mutual fund for every purpose"""
+    return build_score_table(metrics, _metric_columns(metrics, MFMetrics), rules)
+
+
+def build_score_table(metrics: Mapping, columns: Mapping[str, np.ndarray],
+                      rules: Sequence[SellRule]) -> ScoreTable:
+    """Evaluate a rule table over metric columns into a ScoreTable"""
+    if len(rules) > MAX_RULES:
+        raise ValueError(f"At most {MAX_RULES} sell rules per asset class, got {len(rules)}")
+    triggered = np.zeros((len(metrics), len(rules)), dtype=bool)
+    for i, rule in enumerate(rules):
+        column = columns[rule.metric] if rule.metric in columns else peer_feature_default(rule.metric, len(metrics))
+        triggered[:, i] = COMPARATORS[rule.comparator](column, _encode_threshold(rule.threshold))
+    masks = np.zeros(len(metrics), dtype=np.uint64)
+    for i in range(len(rules)):
+        masks |= triggered[:, i].astype(np.uint64) << np.uint64(i)
+
+    weights = np.zeros((len(rules), len(PURPOSES)))
+    for i, rule in enumerate(rules):
+        for purpose in rule.purposes or PURPOSES:
+            weights[i, _PURPOSE_INDEX[purpose]] = rule.weight
+
+    scores = triggered @ weights
+    scores = np.where(scores > 0, scores, 0.0)
+    return ScoreTable(metrics, rules, masks, scores)
+
+
+def _encode_threshold(threshold):
+    """SEBI categories are stored as codes into SEBI_CATEGORIES"""
+    if isinstance(threshold, SEBIRiskCategory):
+        return SEBI_CATEGORIES.index(threshold)
+    if isinstance(threshold, (tuple, list)):
+        return [_encode_threshold(value) for value in threshold]
+    return threshold
+
+
+def _metric_columns(metrics: Mapping, metrics_cls) -> Dict[str, np.ndarray]:
+    """One array per metric field in the mapping's row order, SEBI categories as codes"""
+    if isinstance(metrics, MetricStore):
+        columns = dict(metrics.columns)
+        for field in fields(metrics_cls):
+            # Fields not in the screener read as the dataclass default
+            if field.name not in columns and field.name != 'sebi_risk_category':
+                columns[field.name] = np.full(len(metrics), field.default, dtype=np.float64)
+        return columns
+    columns = {}
+    for field in fields(metrics_cls):
+        values = [getattr(row, field.name) for row in metrics.values()]
+        if field.name == 'sebi_risk_category':
+            columns[field.name] = np.array([SEBI_CATEGORIES.index(value) for value in values], dtype=np.int8)
+        else:
+            columns[field.name] = np.array(values, dtype=np.float64)
+    return columns
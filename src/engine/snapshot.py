@@ -0,0 +1,279 @@
+import hashlib
+import os
+import random
+import threading
+import time
+import uuid
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Sequence, Set, Tuple
+from ..models.enums import SEBIRiskCategory
+from ..models.metrics import StockMetrics, MFMetrics
+from .cohorts import with_peer_features
+from .ingest import MF_SCHEMA, SEBI_CATEGORIES, STOCK_SCHEMA, CompiledScreener, ScreenerSchema, load_columns
+from .scoring import DEFAULT_SCORING, ScoringConfig, SellRule, build_mf_scores, build_stock_scores, load_scoring_config
+from .store import MetricStore
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'assets')
+
+# Compiled columnar cache of the screener CSVs, kept next to the sources
+CACHE_DIRNAME = '.cache'
+
+STOCK_CSV = 'Stock_Screener.csv'
+MF_CSV = 'Mutual_Fund_Screener.csv'
+
+# Screener CSV -> schema for every asset class in a snapshot
+SCREENERS = {
+    STOCK_CSV: STOCK_SCHEMA,
+    MF_CSV: MF_SCHEMA,
+}
+
+# Optional override of the built-in sale-priority rules, hot-reloaded alongside the screeners
+SCORING_CONFIG = 'scoring_rules.json'
+
+
+class ScreenerSnapshot:
+    """Immutable, process-wide view of the screener universe shared by all requests"""
+
+    __slots__ = ('stock_metrics', 'mf_metrics', 'version', 'sources', 'scoring', 'stock_scores', 'mf_scores')
+
+    def __init__(self, stock_metrics: Mapping[str, StockMetrics], mf_metrics: Mapping[str, MFMetrics],
+                 version: Optional[str] = None, sources: Optional[Dict[str, CompiledScreener]] = None,
+                 scoring: Optional[ScoringConfig] = None):
+        object.__setattr__(self, 'stock_metrics', _read_only(stock_metrics))
+        object.__setattr__(self, 'mf_metrics', _read_only(mf_metrics))
+        object.__setattr__(self, 'version', version or uuid.uuid4().hex[:12])
+        # Compiled screeners keyed by CSV filename, reused by delta reloads
+        object.__setattr__(self, 'sources', MappingProxyType(dict(sources or {})))
+        # Sale-priority scores for every instrument, computed once per snapshot
+        # and scoring config; a config change produces a new snapshot
+        object.__setattr__(self, 'scoring', scoring or DEFAULT_SCORING)
+        object.__setattr__(self, 'stock_scores', build_stock_scores(self.stock_metrics, self.scoring.stock_rules))
+        object.__setattr__(self, 'mf_scores', build_mf_scores(self.mf_metrics, self.scoring.mf_rules))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScreenerSnapshot is immutable")
+
+
+class SnapshotHolder:
+    """
+    Versioned holder for the current screener snapshot with an optional background reloader
+
+    Requests read `current` once and keep that snapshot for their whole
+    lifetime. The reloader polls the screener CSVs and the scoring config
+    and, once a change has settled, builds the replacement off the request
+    path and publishes it with a single reference assignment.
+    """
+
+    def __init__(self, assets_dir: Optional[str] = None,
+                 loader: Callable[..., ScreenerSnapshot] = None):
+        self.assets_dir = assets_dir or ASSETS_DIR
+        self._loader = loader or load_screener_snapshot
+        self._stat = self._source_stat()
+        self._snapshot = self._loader(self.assets_dir)
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def current(self) -> ScreenerSnapshot:
+        return self._snapshot
+
+    def reload(self) -> bool:
+        """Rebuild the snapshot from disk; returns True if a new version was published"""
+        with self._reload_lock:
+            try:
+                snapshot = self._loader(self.assets_dir, fallback=False, previous=self._snapshot)
+            except Exception as e:
+                # Keep serving the last good snapshot rather than sample data
+                print(f"Error reloading screener data, keeping version {self._snapshot.version}: {str(e)}")
+                return False
+            if (snapshot.version, snapshot.scoring.version) == (self._snapshot.version, self._snapshot.scoring.version):
+                return False
+            self._snapshot = snapshot
+            print(f"Screener snapshot reloaded: version {snapshot.version}, scoring {snapshot.scoring.version}")
+            return True
+
+    def start(self, poll_interval: float):
+        """Start the background reloader polling the screener CSVs every poll_interval seconds"""
+        if self._thread is not None or poll_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._watch, args=(poll_interval,),
+                                        name='screener-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background reloader"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, poll_interval: float):
+        pending = None
+        while not self._stop.wait(poll_interval):
+            stat = self._source_stat()
+            if stat == self._stat:
+                pending = None
+                continue
+            # Wait for one quiet interval so a half-copied vendor drop is not loaded
+            if stat != pending:
+                pending = stat
+                continue
+            self._stat = stat
+            pending = None
+            self.reload()
+
+    def _source_stat(self) -> Tuple:
+        stats = []
+        for filename in (*SCREENERS, SCORING_CONFIG):
+            try:
+                stat = os.stat(os.path.join(self.assets_dir, filename))
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+
+def _read_only(metrics: Mapping) -> Mapping:
+    """Freeze plain dicts; MetricStores are already read-only"""
+    return metrics if isinstance(metrics, MetricStore) else MappingProxyType(dict(metrics))
+
+
+def load_screener_snapshot(assets_dir: Optional[str] = None, fallback: bool = True,
+                           previous: Optional[ScreenerSnapshot] = None) -> ScreenerSnapshot:
+    """
+    Load asset metrics from CSV files (via the compiled cache)
+
+    With fallback, missing or unreadable screeners are replaced by sample
+    data; without it the error is raised so a reload can keep the old data.
+    Given the previous snapshot, changed screeners are ingested as a delta.
+    The version is derived from the source content, so every worker reports
+    the same version for the same files. The scoring config is versioned
+    separately (snapshot.scoring.version).
+    """
+    assets_dir = assets_dir or ASSETS_DIR
+    cache_dir = os.path.join(assets_dir, CACHE_DIRNAME)
+    previous_sources = previous.sources if previous is not None else {}
+    started = time.perf_counter()
+    # Asset classes are loaded one after the other: ingest holds the GIL for
+    # most of its time, and a thread pool measured no faster than this
+    timings = []
+    try:
+        loaded = {}
+        for filename, schema in SCREENERS.items():
+            source_started = time.perf_counter()
+            loaded[filename] = _load_source(os.path.join(assets_dir, filename), schema,
+                                            cache_dir, fallback, previous_sources.get(filename))
+            if loaded[filename] is not None:
+                timings.append(f"{schema.label}: {len(loaded[filename].names)} instruments in "
+                               f"{(time.perf_counter() - source_started) * 1000:.1f} ms")
+    except Exception as e:
+        if not fallback:
+            raise
+        print(f"Error loading data: {str(e)}")
+        loaded = dict.fromkeys(SCREENERS)
+    print(f"Screener snapshot loaded in {(time.perf_counter() - started) * 1000:.1f} ms"
+          + (f" ({'; '.join(timings)})" if timings else ""))
+
+    stock_source, mf_source = loaded[STOCK_CSV], loaded[MF_CSV]
+    scoring = _load_scoring(os.path.join(assets_dir, SCORING_CONFIG), fallback)
+
+    # Only the cohort features the rules reference are built; they are
+    # carried over from the previous snapshot where no peer changed
+    previous_stocks = previous.stock_metrics if previous is not None else None
+    previous_mfs = previous.mf_metrics if previous is not None else None
+    stock_metrics = (MetricStore(stock_source.names,
+                                 with_peer_features(stock_source.names, stock_source.columns, STOCK_SCHEMA,
+                                                    _rule_metrics(scoring.stock_rules), previous_stocks),
+                                 StockMetrics)
+                     if stock_source is not None else _initialize_sample_stock_data())
+    mf_metrics = (MetricStore(mf_source.names,
+                              with_peer_features(mf_source.names, mf_source.columns, MF_SCHEMA,
+                                                 _rule_metrics(scoring.mf_rules), previous_mfs),
+                              MFMetrics, {'sebi_risk_category': SEBI_CATEGORIES.__getitem__})
+                  if mf_source is not None else _initialize_sample_mf_data())
+
+    if any(source is None for source in loaded.values()):
+        version = 'sample-' + uuid.uuid4().hex[:8]
+    else:
+        version = hashlib.sha256(':'.join(source.source_hash for source in loaded.values()).encode()).hexdigest()[:12]
+    sources = {filename: source for filename, source in loaded.items() if source is not None}
+    return ScreenerSnapshot(stock_metrics, mf_metrics, version, sources, scoring)
+
+
+def _load_source(csv_path: str, schema: ScreenerSchema, cache_dir: Optional[str], fallback: bool,
+                 previous: Optional[CompiledScreener]) -> Optional[CompiledScreener]:
+    """Compile one screener CSV; None means it is missing and sample data should be used"""
+    if not os.path.exists(csv_path):
+        if not fallback:
+            raise FileNotFoundError(f"Screener CSV not found at {csv_path}")
+        print(f"Warning: Screener CSV not found at {csv_path}")
+        return None
+    return load_columns(csv_path, schema, cache_dir, previous)
+
+
+def _rule_metrics(rules: Sequence[SellRule]) -> Set[str]:
+    return {rule.metric for rule in rules}
+
+
+def _load_scoring(config_path: str, fallback: bool) -> ScoringConfig:
+    """
+    Load the scoring config that overrides the built-in rules, if there is one
+
+    Without a config file the built-in rules apply (also on reload, so
+    deleting the file reverts to them). With fallback, an invalid file also
+    means the built-in rules; without it the error is raised.
+    """
+    if not os.path.exists(config_path):
+        return DEFAULT_SCORING
+    try:
+        return load_scoring_config(config_path)
+    except Exception as e:
+        if not fallback:
+            raise
+        print(f"Error loading scoring config, using built-in rules: {str(e)}")
+        return DEFAULT_SCORING
+
+
+def _initialize_sample_stock_data() -> Dict[str, StockMetrics]:
+    """Fallback method to initialize sample stock data"""
+    stock_samples = ["Reliance Industries Ltd", "Tata Consultancy Services Ltd", "HDFC Bank Ltd",
+                     "Infosys Ltd", "ITC Ltd", "Wipro Ltd", "Bajaj Finance Ltd", "HCL Technologies Ltd"]
+    stock_metrics = {}
+    for stock in stock_samples:
+        stock_metrics[stock] = StockMetrics(
+            pe_ratio=random.uniform(10, 50),
+            rsi_14d=random.uniform(20, 80),
+            pledged_promoter_holdings=random.uniform(0, 30),
+            promoter_holding=random.uniform(30, 80),
+            beta=random.uniform(0.3, 2.5),
+            six_month_return_vs_nifty=random.uniform(-25, 35),
+            five_year_cagr=random.uniform(5, 30),
+            debt_to_equity=random.uniform(0, 2.0),
+            roce=random.uniform(5, 30),
+            return_on_equity=random.uniform(5, 35),
+            dividend_yield=random.uniform(0, 8),
+            free_cash_flow=random.uniform(-500, 5000),
+            close_price=random.uniform(50, 5000)
+        )
+    return stock_metrics
+
+
+def _initialize_sample_mf_data() -> Dict[str, MFMetrics]:
+    """Initialize sample mutual fund data"""
+    mf_samples = ["HDFC_FLEXICAP", "AXIS_BLUECHIP", "SBI_SMALLCAP", "ICICI_BALANCED", "HDFC_DEBT"]
+    mf_metrics = {}
+    for mf in mf_samples:
+        mf_metrics[mf] = MFMetrics(
+            cagr_3y=random.uniform(6, 20),
+            expense_ratio=random.uniform(0.5, 2.5),
+            volatility=random.uniform(8, 25),
+            sharpe_ratio=random.uniform(0.2, 2.0),
+            alpha=random.uniform(-5, 8),
+            sortino_ratio=random.uniform(0.5, 2.5),
+            tracking_error=random.uniform(1, 8),
+            time_since_inception=random.randint(12, 180),
+            sebi_risk_category=random.choice(list(SEBIRiskCategory)),
+            nav=random.uniform(10, 500)
+        )
+    return mf_metrics
@@ -0,0 +1,184 @@
+import time
+import numpy as np
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional, Tuple
+
+# Retention model for the exact solver. Selling a rupee of a holding loses
+# its retention weight (see retention_weights). Fully exiting a holding
+# also loses EXIT_PREMIUM of the whole position's retention value, and a
+# partial sale must leave at least MIN_RETAINED_FRACTION of the holding, so
+# a plan cannot dodge the premium by selling 99.9% of a position.
+EXIT_PREMIUM = 0.1
+MIN_RETAINED_FRACTION = 0.1
+
+# Wall-clock budget per solve; the best plan found so far is returned when it runs out
+DEFAULT_TIME_BUDGET = 0.05
+
+# Relative gap within which a plan counts as optimal (prunes near-tied subtrees)
+OPTIMALITY_GAP = 1e-6
+
+_EPSILON = 1e-9
+
+
+class LiquidationPlan(NamedTuple):
+    """Rupees to sell per asset (input order) and the retention value lost"""
+    amounts: np.ndarray
+    cost: float
+    optimal: bool  # False if the time budget ran out before optimality was proven
+    nodes: int  # branch-and-bound nodes explored
+
+
+def retention_weights(scores: np.ndarray) -> np.ndarray:
+    """Retention value per rupee of a holding: 1 at sale score 0, halving by score 100"""
+    return 100.0 / (100.0 + np.maximum(np.asarray(scores, dtype=np.float64), 0.0))
+
+
+def solve_liquidation(values: np.ndarray, scores: np.ndarray, amount: float,
+                      time_budget: float = DEFAULT_TIME_BUDGET) -> Optional[LiquidationPlan]:
+    """
+    Minimise retention value lost while selling at least `amount` (branch and bound)
+
+    Every holding offers two tranches: the sellable part (1 - MIN_RETAINED_FRACTION)
+    at its retention weight per rupee, and the exit tranche, the retained
+    residue, which also carries the exit premium. The LP relaxation takes
+    tranches cheapest-first, and at most one tranche is fractional. A
+    fractional exit tranche is the only integrality violation, so the search
+    branches on it: either exit that holding fully or keep its residue.
+    Children are explored best-bound first and pruned against the incumbent.
+
+    Returns the best plan found. If the budget runs out before any complete
+    plan is found, returns None so the caller can fall back to greedy. If
+    the holdings cannot cover the amount, every holding is sold.
+    """
+    deadline = time.perf_counter() + time_budget
+    values = np.maximum(np.asarray(values, dtype=np.float64), 0.0)
+    weights = retention_weights(scores)
+    n = len(values)
+    if amount <= _EPSILON:
+        return LiquidationPlan(np.zeros(n), 0.0, True, 0)
+    if values.sum() <= amount + _EPSILON:
+        return LiquidationPlan(values.copy(), float((weights * values).sum() * (1 + EXIT_PREMIUM)), True, 0)
+
+    # Both tranches of every holding, ordered by cost per rupee; a holding's
+    # sellable tranche always precedes its exit tranche
+    rates = np.concatenate([weights, weights * (1 + EXIT_PREMIUM / MIN_RETAINED_FRACTION)])
+    order = np.argsort(rates, kind='stable')
+    tranche_item = np.concatenate([np.arange(n), np.arange(n)])[order]
+    tranche_is_exit = np.concatenate([np.zeros(n, dtype=bool), np.ones(n, dtype=bool)])[order].tolist()
+    sizes = np.concatenate([values * (1.0 - MIN_RETAINED_FRACTION), values * MIN_RETAINED_FRACTION])[order]
+    tranche_rate = rates[order]
+    position = np.empty(2 * n, dtype=np.int64)
+    position[order] = np.arange(2 * n)
+    sell_position, exit_position = position[:n].tolist(), position[n:].tolist()
+
+    # Every node's LP is the root's cheapest-first fill minus the tranches its
+    # branching decisions removed, so bounds come from two root prefix sums
+    # corrected by the node's (few) removed tranches, found by binary search
+    covered = np.cumsum(sizes).tolist()
+    spent_by_tranche = sizes * tranche_rate
+    spent = np.cumsum(spent_by_tranche).tolist()
+    size_list, rate_list, item_list = sizes.tolist(), tranche_rate.tolist(), tranche_item.tolist()
+    exit_cost = (weights * values * (1 + EXIT_PREMIUM)).tolist()
+    value_list = values.tolist()
+    last = 2 * n - 1
+
+    def relax(node: '_Node') -> '_Node':
+        """Solve a node's LP relaxation: bound, critical tranche and the holding to branch on"""
+        node.branch_item = -1
+        node.bound = node.fixed_cost
+        if node.need <= _EPSILON:
+            node.critical = -1
+            return node
+        removed, removed_size, removed_spent = node.removed, node.removed_size, node.removed_spent
+
+        def covered_at(k: int) -> float:
+            return covered[k] - removed_size[bisect_right(removed, k)]
+
+        if covered_at(last) < node.need - _EPSILON:
+            node.bound = np.inf
+            return node
+        low, high = 0, last
+        while low < high:
+            middle = (low + high) // 2
+            if covered_at(middle) >= node.need - _EPSILON:
+                high = middle
+            else:
+                low = middle + 1
+        critical = low
+        before = bisect_right(removed, critical - 1)
+        covered_before = (covered[critical - 1] - removed_size[before]) if critical else 0.0
+        spent_before = (spent[critical - 1] - removed_spent[before]) if critical else 0.0
+        node.critical = critical
+        node.partial = node.need - covered_before
+        node.bound += spent_before + node.partial * rate_list[critical]
+        if tranche_is_exit[critical] and node.partial < size_list[critical] - _EPSILON:
+            node.branch_item = item_list[critical]
+        return node
+
+    def amounts_of(node: '_Node', round_up: bool = False) -> np.ndarray:
+        fill = np.zeros(2 * n)
+        if node.critical >= 0:
+            fill[:node.critical] = sizes[:node.critical]
+            fill[node.removed] = 0.0
+            fill[node.critical] = size_list[node.critical] if round_up else node.partial
+        amounts = np.bincount(tranche_item, weights=fill, minlength=n)
+        amounts[list(node.exited)] = values[list(node.exited)]
+        return amounts
+
+    def child(node: '_Node', item: int, exit_item: bool) -> '_Node':
+        positions = [sell_position[item], exit_position[item]] if exit_item else [exit_position[item]]
+        removed = np.sort(np.array(node.removed + positions, dtype=np.int64))
+        removed_size = np.concatenate([[0.0], np.cumsum(sizes[removed])]).tolist()
+        removed_spent = np.concatenate([[0.0], np.cumsum(spent_by_tranche[removed])]).tolist()
+        removed = removed.tolist()
+        if exit_item:
+            return relax(_Node(removed, removed_size, removed_spent, node.exited + (item,),
+                               node.need - value_list[item], node.fixed_cost + exit_cost[item]))
+        return relax(_Node(removed, removed_size, removed_spent, node.exited, node.need, node.fixed_cost))
+
+    best = None
+    best_cost = prune_above = np.inf
+    nodes = 0
+    optimal = True
+    stack: List[_Node] = [relax(_Node([], [0.0], [0.0], (), float(amount), 0.0))]
+    while stack:
+        if time.perf_counter() > deadline:
+            optimal = False
+            break
+        node = stack.pop()
+        nodes += 1
+        if node.bound >= prune_above:
+            continue
+        if node.branch_item < 0:
+            best, best_cost = amounts_of(node), node.bound
+            prune_above = best_cost * (1 - OPTIMALITY_GAP) - _EPSILON
+            continue
+        # Exiting the fractional holding outright is always feasible: a cheap incumbent
+        rounded_cost = node.bound + (size_list[node.critical] - node.partial) * rate_list[node.critical]
+        if rounded_cost < best_cost - _EPSILON:
+            best, best_cost = amounts_of(node, round_up=True), rounded_cost
+            prune_above = best_cost * (1 - OPTIMALITY_GAP) - _EPSILON
+        children = [child(node, node.branch_item, True), child(node, node.branch_item, False)]
+        # Depth-first, best bound on top of the stack
+        children.sort(key=lambda c: c.bound, reverse=True)
+        stack.extend(c for c in children if c.bound < prune_above)
+
+    if best is None:
+        return None
+    return LiquidationPlan(best, float(best_cost), optimal, nodes)
+
+
+class _Node:
+    """Branch-and-bound node: tranches removed by branching, forced exits and the need left"""
+
+    __slots__ = ('removed', 'removed_size', 'removed_spent', 'exited', 'need', 'fixed_cost',
+                 'bound', 'critical', 'partial', 'branch_item')
+
+    def __init__(self, removed: List[int], removed_size: List[float], removed_spent: List[float],
+                 exited: Tuple[int, ...], need: float, fixed_cost: float):
+        self.removed = removed  # sorted tranche positions unavailable at this node
+        self.removed_size = removed_size  # prefix sums over removed, for bound corrections
+        self.removed_spent = removed_spent
+        self.exited = exited
+        self.need = need
+        self.fixed_cost = fixed_cost
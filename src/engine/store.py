@@ -0,0 +1,110 @@
+import sys
+import numpy as np
+from collections.abc import Mapping
+from dataclasses import MISSING, fields
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+class MetricStore(Mapping):
+    """
+    Read-only name -> metrics mapping backed by one typed NumPy column per metric
+
+    Names are stored as sorted UTF-8 bytes, so the name column doubles as
+    the name-to-index map via binary search. The columns are usually
+    memory-mapped files shared by every worker on the box. Lookups return
+    a lightweight row view exposing the same attributes as the metrics
+    dataclass; no per-instrument Python objects are kept alive.
+    """
+
+    def __init__(self, names: np.ndarray, columns: Mapping[str, np.ndarray], metrics_cls,
+                 decoders: Optional[Dict[str, Callable]] = None):
+        # Plain ndarray views of the (possibly memory-mapped) buffers: same
+        # shared pages without np.memmap's per-access overhead
+        self.names = names.view(np.ndarray)
+        self.columns = MappingProxyType({field: column.view(np.ndarray) for field, column in columns.items()})
+        self.metrics_cls = metrics_cls
+        self._row_cls = _row_view_class(metrics_cls, columns, decoders or {})
+
+    def index_of(self, name) -> int:
+        """Row index for a name, or -1 if it is not in the store"""
+        if not isinstance(name, str) or not len(self.names):
+            return -1
+        key = name.encode('utf-8')
+        index = int(self.names.searchsorted(key))
+        if index < len(self.names) and self.names.item(index) == key:
+            return index
+        return -1
+
+    def rows_of(self, names: Sequence) -> np.ndarray:
+        """Row index per name (-1 if not in the store), as one vectorized binary search"""
+        if not len(names) or not len(self.names):
+            return np.full(len(names), -1, dtype=np.int64)
+        valid = np.fromiter((isinstance(name, str) for name in names), dtype=bool, count=len(names))
+        keys = np.array([name.encode('utf-8') if is_str else b'' for name, is_str in zip(names, valid.tolist())],
+                        dtype=np.bytes_)
+        index = np.minimum(self.names.searchsorted(keys), len(self.names) - 1)
+        return np.where(valid & (self.names[index] == keys), index, -1)
+
+    def name_at(self, index: int) -> str:
+        """Interned instrument name of a row"""
+        return sys.intern(self.names.item(index).decode('utf-8'))
+
+    def __getitem__(self, name):
+        index = self.index_of(name)
+        if index < 0:
+            raise KeyError(name)
+        return self._row_cls(self, index)
+
+    def __contains__(self, name) -> bool:
+        return self.index_of(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (sys.intern(name.decode('utf-8')) for name in self.names.tolist())
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class MetricRow:
+    """Attribute view of one row of a MetricStore"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: MetricStore, index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._store.name_at(self._index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+_ROW_VIEW_CLASSES = {}
+
+
+def _row_view_class(metrics_cls, columns: Mapping[str, np.ndarray], decoders: Dict[str, Callable]):
+    """Build (once per layout) a MetricRow subclass with one property per dataclass field"""
+    key = (metrics_cls, tuple(sorted(columns)), tuple(sorted(decoders.items(), key=lambda item: item[0])))
+    if key in _ROW_VIEW_CLASSES:
+        return _ROW_VIEW_CLASSES[key]
+
+    namespace = {'__slots__': ()}
+    for field in fields(metrics_cls):
+        if field.name in columns:
+            namespace[field.name] = _column_property(field.name, decoders.get(field.name))
+        else:
+            # Not in the screener (e.g. holding-specific fields): the dataclass default
+            default = field.default if field.default is not MISSING else field.default_factory()
+            namespace[field.name] = property(lambda self, value=default: value)
+    row_cls = type(metrics_cls.__name__ + 'Row', (MetricRow,), namespace)
+    _ROW_VIEW_CLASSES[key] = row_cls
+    return row_cls
+
+
+def _column_property(field_name: str, decode: Optional[Callable]) -> property:
+    if decode is None:
+        return property(lambda self: self._store.columns[field_name].item(self._index))
+    return property(lambda self: decode(self._store.columns[field_name].item(self._index)))
@@ -0,0 +1,162 @@
+import numpy as np
+from dataclasses import fields
+from typing import Dict, List, Mapping, NamedTuple, Sequence, Tuple
+from ..models.metrics import StockMetrics, MFMetrics
+
+# Capital gains on listed shares and equity-oriented funds. Holdings held
+# longer than LTCG_MIN_MONTHS are long-term; long-term gains up to
+# LTCG_EXEMPTION per person per financial year are tax-free.
+LTCG_MIN_MONTHS = 12
+STCG_RATE = 0.20
+LTCG_RATE = 0.125
+LTCG_EXEMPTION = 125000.0
+
+# Sale-priority points lost per unit of tax drag (tax per rupee sold), so a
+# holding whose sale loses 20% to STCG ranks 20 points lower
+TAX_DRAG_WEIGHT = 100.0
+
+# Gross-up: array passes before the closing safety step, and the rupee tolerance
+MAX_GROSS_UP_PASSES = 6
+GROSS_UP_TOLERANCE = 0.01
+
+_MAX_TAX_RATE = max(STCG_RATE, LTCG_RATE)
+_NO_DETAILS = {}
+
+
+def _field_default(metrics_cls, name: str):
+    return next(field.default for field in fields(metrics_cls) if field.name == name)
+
+
+# Holding period assumed when the request does not give one
+DEFAULT_MONTHS_HELD = {
+    'stock': _field_default(StockMetrics, 'months_held'),
+    'mf': _field_default(MFMetrics, 'months_held'),
+}
+
+
+class TaxProfile(NamedTuple):
+    """Per-holding tax inputs, aligned with a list of assets"""
+    gain_fraction: np.ndarray  # gain (or loss, < 0) realised per rupee sold
+    long_term: np.ndarray  # bool
+    member: np.ndarray  # index into members
+    members: List[str]
+    exemption_left: np.ndarray  # LTCG exemption still available, per member
+
+    def take(self, order: np.ndarray) -> 'TaxProfile':
+        """The same profile for the assets reordered by `order`"""
+        return self._replace(gain_fraction=self.gain_fraction[order], long_term=self.long_term[order],
+                             member=self.member[order])
+
+
+class TaxSummary(NamedTuple):
+    """Household capital gains and tax of a set of sales"""
+    tax: float
+    short_term_gain: float  # net, after losses
+    long_term_gain: float  # net, after losses, before the exemption
+    exemption_used: float
+
+
+def tax_profile(assets: Sequence[Dict], holding_details: Mapping, exemption_used: Mapping) -> TaxProfile:
+    """
+    Tax inputs for a list of assets from the request's holding details
+
+    holding_details is {member: {name: {"cost_basis": rupees, "months_held": int}}}.
+    Without a cost basis a holding is assumed to carry no gain; without a
+    holding period, the metrics' months_held default applies.
+    exemption_used is {member: LTCG exemption already used this year}.
+    """
+    members = sorted({asset['member'] for asset in assets})
+    member_index = {member: i for i, member in enumerate(members)}
+    n = len(assets)
+    values = np.fromiter((asset['estimated_value'] for asset in assets), dtype=np.float64, count=n)
+    details = [holding_details.get(asset['member'], _NO_DETAILS).get(asset['asset_id']) or _NO_DETAILS
+               for asset in assets]
+    # NaN marks a missing cost basis: the holding is sold at cost
+    basis = np.fromiter((details_i.get('cost_basis', np.nan) for details_i in details), dtype=np.float64, count=n)
+    basis = np.where(np.isnan(basis), values, np.maximum(basis, 0.0))
+    months = np.fromiter((details_i.get('months_held', DEFAULT_MONTHS_HELD[asset['type']])
+                          for details_i, asset in zip(details, assets)), dtype=np.float64, count=n)
+    gain_fraction = np.divide(values - basis, values, out=np.zeros(n), where=values > 0)
+    exemption_left = np.array([max(LTCG_EXEMPTION - float(exemption_used.get(member, 0.0)), 0.0)
+                               for member in members])
+    return TaxProfile(gain_fraction, months > LTCG_MIN_MONTHS,
+                      np.fromiter((member_index[asset['member']] for asset in assets), dtype=np.int64, count=n),
+                      members, exemption_left)
+
+
+def tax_drag(profile: TaxProfile) -> np.ndarray:
+    """Tax per rupee sold of each holding, ignoring the exemption and offsets"""
+    rates = np.where(profile.long_term, LTCG_RATE, STCG_RATE)
+    return np.maximum(profile.gain_fraction, 0.0) * rates
+
+
+def capital_gains_tax(profile: TaxProfile, amounts: np.ndarray) -> TaxSummary:
+    """
+    Tax on selling `amounts` rupees of each holding, computed per member
+
+    Short-term losses offset long-term gains; long-term losses only offset
+    long-term gains. Long-term gains are taxed above the member's
+    remaining exemption.
+    """
+    gains = amounts * profile.gain_fraction
+    members = len(profile.members)
+    short_term = np.bincount(profile.member, np.where(profile.long_term, 0.0, gains), minlength=members)
+    long_term = np.bincount(profile.member, np.where(profile.long_term, gains, 0.0), minlength=members)
+    long_term = np.maximum(long_term + np.minimum(short_term, 0.0), 0.0)
+    short_term = np.maximum(short_term, 0.0)
+    exemption_used = np.minimum(long_term, profile.exemption_left)
+    tax = STCG_RATE * short_term + LTCG_RATE * (long_term - exemption_used)
+    return TaxSummary(float(tax.sum()), float(short_term.sum()), float(long_term.sum()), float(exemption_used.sum()))
+
+
+def gross_up_sales(values: np.ndarray, profile: TaxProfile, net_needed: float) -> Tuple[np.ndarray, TaxSummary]:
+    """
+    Greedy sales (in asset order) whose proceeds net of tax cover `net_needed`
+
+    The gross amount is found by Newton steps on net proceeds, each one
+    array pass over the holdings: the slope is 1 minus the marginal tax
+    rate, taken from the holding at the cut at first and from the secant
+    of the last two passes after that. If the passes run out, a final step
+    at the highest tax rate guarantees the net amount is covered. When the
+    holdings cannot cover it, everything is sold.
+    """
+    values = np.maximum(np.asarray(values, dtype=np.float64), 0.0)
+    before = np.concatenate([[0.0], np.cumsum(values)])
+    total = before[-1]
+    drag = tax_drag(profile)
+
+    def sales_for(gross: float) -> np.ndarray:
+        return np.clip(gross - before[:-1], 0.0, values)
+
+    if net_needed <= 0 or not len(values):
+        amounts = np.zeros(len(values))
+        return amounts, capital_gains_tax(profile, amounts)
+
+    gross = min(net_needed, total)
+    previous = None
+    for _ in range(MAX_GROSS_UP_PASSES):
+        amounts = sales_for(gross)
+        summary = capital_gains_tax(profile, amounts)
+        net = gross - summary.tax
+        error = net_needed - net
+        if -GROSS_UP_TOLERANCE <= error <= 0 or (gross >= total and error > 0):
+            return amounts, summary
+        if previous is None or previous[0] == gross:
+            cut = min(int(np.searchsorted(before[1:], gross, side='left')), len(values) - 1)
+            slope = 1.0 - drag[cut]
+        else:
+            slope = (net - previous[1]) / (gross - previous[0])
+        slope = min(max(slope, 1.0 - _MAX_TAX_RATE), 1.0)
+        previous = (gross, net)
+        # Aim a tolerance above the target so the result does not fall just short
+        gross = min(max(gross + (error + GROSS_UP_TOLERANCE / 2) / slope, 0.0), total)
+
+    amounts = sales_for(gross)
+    summary = capital_gains_tax(profile, amounts)
+    error = net_needed - (gross - summary.tax)
+    if error > 0:
+        # Net proceeds grow by at least 1 - the highest rate per extra rupee sold
+        gross = min(gross + error / (1.0 - _MAX_TAX_RATE), total)
+        amounts = sales_for(gross)
+        summary = capital_gains_tax(profile, amounts)
+    return amounts, summary
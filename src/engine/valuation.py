@@ -0,0 +1,71 @@
+import math
+import numpy as np
+from typing import Dict, List, NamedTuple
+from .scoring import ScoreTable
+from .store import MetricStore
+
+# Decimal places a sale quantity is rounded to: whole shares, MF units to 0.001
+UNIT_DECIMALS = {
+    'stock': 0,
+    'mf': 3,
+}
+
+_EPSILON = 1e-9
+
+
+class ValuedHoldings(NamedTuple):
+    """Holdings quantities valued at snapshot prices, all {member: {name: x}}"""
+    values: Dict[str, Dict[str, float]]  # rupees, 0 for unpriced holdings
+    quantities: Dict[str, Dict[str, float]]
+    prices: Dict[str, Dict[str, float]]
+    unpriced: Dict[str, List[str]]  # member -> holdings without a snapshot price
+
+
+def price_column(table: ScoreTable, price_field: str) -> np.ndarray:
+    """Price of every instrument in a score table's row order (0 if unknown)"""
+    metrics = table.metrics
+    if isinstance(metrics, MetricStore):
+        if price_field in metrics.columns:
+            return metrics.columns[price_field]
+        return np.zeros(len(metrics))
+    return np.array([getattr(row, price_field) for row in metrics.values()], dtype=np.float64)
+
+
+def value_holdings(holdings: Dict[str, Dict[str, float]], table: ScoreTable, price_field: str) -> ValuedHoldings:
+    """
+    Value share / unit quantities at snapshot prices
+
+    Every member's holdings are flattened into one quantity array and one
+    price gather, so valuing a book is a single array multiply. Holdings
+    not in the screener, or without a positive price, are valued at 0 and
+    reported as unpriced.
+    """
+    keys = [(member, name) for member, items in holdings.items() for name in items]
+    quantities = np.fromiter((float(holdings[member][name]) for member, name in keys),
+                             dtype=np.float64, count=len(keys))
+    rows = table.rows(name for _, name in keys)
+    prices = price_column(table, price_field)
+    gathered = np.where(rows >= 0, prices[rows], 0.0) if len(prices) else np.zeros(len(keys))
+    priced = gathered > 0
+    values = np.where(priced, quantities * gathered, 0.0)
+
+    valued = ValuedHoldings({member: {} for member in holdings}, {member: {} for member in holdings},
+                            {member: {} for member in holdings}, {})
+    for (member, name), quantity, price, value, has_price in zip(
+            keys, quantities.tolist(), gathered.tolist(), values.tolist(), priced.tolist()):
+        valued.values[member][name] = value
+        valued.quantities[member][name] = quantity
+        valued.prices[member][name] = price
+        if not has_price:
+            valued.unpriced.setdefault(member, []).append(name)
+    return valued
+
+
+def round_sale_quantity(value: float, price: float, held: float, decimals: int) -> float:
+    """Smallest quantity at the given precision raising `value` at `price`, capped at the holding"""
+    if price <= 0:
+        return 0.0
+    step = 10.0 ** -decimals
+    quantity = math.ceil(value / price / step - _EPSILON) * step
+    # Exiting the whole holding sells it as held, even below the precision
+    return held if quantity >= held else round(quantity, decimals)
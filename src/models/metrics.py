@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from .enums import SEBIRiskCategory
 
-@dataclass
+@dataclass(slots=True)
 class StockMetrics:
     """Metrics for evaluating stocks"""
     pe_ratio: float = 25.0  # P/E Ratio
@@ -16,10 +16,11 @@ class StockMetrics:
     return_on_equity: float = 0.15  # Return on Equity (decimal percentage)
     dividend_yield: float = 0.02  # Dividend Yield (decimal percentage)
     free_cash_flow: float = 1000.0  # Free Cash Flow (in crores)
+    close_price: float = 0.0  # Close price per share in rupees (0 if unknown)
     months_held: int = 12  # Months asset has been held
     is_goal_linked: bool = False  # Whether asset is linked to financial goals
 
-@dataclass
+@dataclass(slots=True)
 class MFMetrics:
     """Metrics for evaluating mutual funds"""
     cagr_3y: float = 0.12  # 3Y CAGR (decimal percentage)
@@ -31,5 +32,6 @@ class MFMetrics:
     tracking_error: float = 3.0  # Tracking Error
     time_since_inception: int = 60  # Time since inception in months
     sebi_risk_category: SEBIRiskCategory = SEBIRiskCategory.MODERATE  # SEBI Risk Category
+    nav: float = 0.0  # Net asset value per unit in rupees (0 if unknown)
     months_held: int = 12  # Months asset has been held
     is_goal_linked: bool = False  # Whether asset is linked to financial goals 
\ No newline at end of file
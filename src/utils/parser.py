@@ -1,5 +1,16 @@
+import math
 from typing import Dict, Tuple
 
+# How portfolio holdings are expressed: rupee values or share / unit quantities
+HOLDINGS_UNITS = ('value', 'quantity')
+
+# Periods in a recurring liquidation schedule (e.g. monthly for a year)
+DEFAULT_RECURRING_PERIODS = 12
+MAX_RECURRING_PERIODS = 120
+
+# Per-holding tax inputs accepted in portfolio.holding_details
+HOLDING_DETAIL_FIELDS = ('cost_basis', 'months_held')
+
 class UserDataParser:
     """Parser for combined user portfolio and questionnaire data"""
     
@@ -19,17 +30,71 @@ class UserDataParser:
         mf_map = portfolio.get('mutual_funds', {})
         stock_map = portfolio.get('stocks', {})
         bank_balances = portfolio.get('bank_balances', {})
+        holdings_unit = portfolio.get('holdings_unit', 'value')
+        if holdings_unit not in HOLDINGS_UNITS:
+            raise ValueError(f"holdings_unit must be one of {', '.join(HOLDINGS_UNITS)}, got {holdings_unit!r}")
         
         # Extract questionnaire responses
         questionnaire = combined_json.get('questionnaire', {})
+        recurring_periods = int(questionnaire.get('recurring_periods', DEFAULT_RECURRING_PERIODS))
+        if not 1 <= recurring_periods <= MAX_RECURRING_PERIODS:
+            raise ValueError(f"recurring_periods must be between 1 and {MAX_RECURRING_PERIODS}, got {recurring_periods}")
         question_answers = {
             'purpose': questionnaire.get('purpose', 'other'),
             'timeline': questionnaire.get('timeline', 'no_timeline'),
             'amount_needed': float(questionnaire.get('amount_needed', 0)),
             'recurring_need': questionnaire.get('recurring_need', 'one_time'),
+            'recurring_periods': recurring_periods,
             'has_goals': questionnaire.get('has_goals', 'no'),
             'income_change': questionnaire.get('income_change', 'no_change'),
-            'priority_members': questionnaire.get('priority_members', [])
+            'priority_members': questionnaire.get('priority_members', []),
+            'solver': questionnaire.get('solver', 'greedy'),
+            'holdings_unit': holdings_unit,
+            'tax_aware': _parse_switch(questionnaire.get('tax_aware', False), 'tax_aware'),
+            'holding_details': _parse_holding_details(portfolio.get('holding_details', {})),
+            'ltcg_exemption_used': _parse_exemption_used(portfolio.get('ltcg_exemption_used', {}))
         }
         
-        return mf_map, stock_map, bank_balances, question_answers 
\ No newline at end of file
+        return mf_map, stock_map, bank_balances, question_answers
+
+
+def _parse_switch(value, field: str) -> bool:
+    """A JSON boolean or a 'yes' / 'no' answer"""
+    if isinstance(value, bool):
+        return value
+    if value in ('yes', 'no'):
+        return value == 'yes'
+    raise ValueError(f"{field} must be true, false, 'yes' or 'no', got {value!r}")
+
+
+def _non_negative_number(value, field: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{field} must be a non-negative number, got {value!r}")
+    return value
+
+
+def _parse_holding_details(holding_details) -> Dict:
+    """Check {member: {asset: {"cost_basis": rupees, "months_held": months}}}; both fields are optional"""
+    if not isinstance(holding_details, dict):
+        raise ValueError("holding_details must map members to {asset: details}")
+    for member, assets in holding_details.items():
+        if not isinstance(assets, dict):
+            raise ValueError(f"holding_details[{member!r}] must map assets to details")
+        for name, details in assets.items():
+            if details is None:
+                continue
+            if not isinstance(details, dict):
+                raise ValueError(f"holding_details[{member!r}][{name!r}] must be an object")
+            for field in HOLDING_DETAIL_FIELDS:
+                if field in details:
+                    _non_negative_number(details[field], f"holding_details[{member!r}][{name!r}].{field}")
+    return holding_details
+
+
+def _parse_exemption_used(exemption_used) -> Dict:
+    """Check {member: LTCG exemption already used this year}"""
+    if not isinstance(exemption_used, dict):
+        raise ValueError("ltcg_exemption_used must map members to rupees")
+    for member, used in exemption_used.items():
+        _non_negative_number(used, f"ltcg_exemption_used[{member!r}]")
+    return exemption_used 
\ No newline at end of file
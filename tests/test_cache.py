@@ -0,0 +1,26 @@
+from src.api.cache import ResponseCache
+
+OLD, NEW = ('snapshot-a', 'rules-1'), ('snapshot-b', 'rules-1')
+
+
+def test_requests_on_the_old_snapshot_keep_new_entries_during_a_swap():
+    cache = ResponseCache()
+    cache.put(NEW, 'request', b'new plan')
+
+    # A request that pinned the old snapshot before the swap finishes afterwards
+    assert cache.get(OLD, 'request') is None
+    cache.put(OLD, 'request', b'old plan')
+
+    assert cache.get(NEW, 'request') == b'new plan'
+    assert cache.get(OLD, 'request') == b'old plan'
+
+
+def test_entries_of_replaced_versions_age_out_through_lru():
+    cache = ResponseCache(max_entries=2)
+    cache.put(OLD, 'request', b'old plan')
+    cache.put(NEW, 'request', b'new plan')
+    cache.put(NEW, 'other', b'other plan')
+
+    assert cache.get(OLD, 'request') is None
+    assert cache.get(NEW, 'request') == b'new plan'
+    assert cache.stats()['evictions'] == 1
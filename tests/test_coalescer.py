@@ -0,0 +1,43 @@
+import random
+import numpy as np
+import pytest
+from src.engine.coalescer import ScoreCoalescer, rank_holdings
+from src.engine.scoring import PURPOSES
+from src.engine.snapshot import load_screener_snapshot
+
+
+@pytest.fixture(scope='module')
+def requests():
+    snapshot = load_screener_snapshot()
+    stocks, mfs = list(snapshot.stock_metrics), list(snapshot.mf_metrics)
+    rng = random.Random(0)
+    return [
+        ([(snapshot.stock_scores, rng.sample(stocks, rng.randint(0, 8))) for _ in range(rng.randint(0, 3))]
+         + [(snapshot.mf_scores, rng.sample(mfs, rng.randint(0, 5)) + ['Not A Fund']) for _ in range(rng.randint(0, 2))],
+         rng.choice(PURPOSES))
+        for _ in range(50)
+    ]
+
+
+def test_batched_ranking_matches_ranking_each_request(requests):
+    for request, batched in zip(requests, rank_holdings(requests)):
+        [alone] = rank_holdings([request])
+        for field in batched._fields:
+            assert np.array_equal(getattr(batched, field), getattr(alone, field)), field
+
+
+def test_sale_order_is_a_stable_sort_by_score(requests):
+    for (lookups, purpose), ranked in zip(requests, rank_holdings(requests)):
+        rows = np.concatenate([table.rows(names) for table, names in lookups]) if lookups else np.zeros(0)
+        scores = np.concatenate([table.scores_at(table.rows(names), purpose, None) for table, names in lookups]
+                                ) if lookups else np.zeros(0)
+        assert np.array_equal(ranked.rows, rows)
+        expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        assert ranked.sale_order.tolist() == expected
+
+
+def test_coalescer_returns_each_request_its_own_ranking(requests):
+    coalescer = ScoreCoalescer(window=0.0)
+    for request, expected in zip(requests, rank_holdings(requests)):
+        ranked = coalescer.rank(*request)
+        assert np.array_equal(ranked.sale_order, expected.sale_order)
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pytest
+from src.engine.ingest import MF_SCHEMA, STOCK_SCHEMA, compile_screener, load_columns
+from src.engine.snapshot import ASSETS_DIR
+
+SCREENERS = [('Stock_Screener.csv', STOCK_SCHEMA), ('Mutual_Fund_Screener.csv', MF_SCHEMA)]
+
+
+def edit_screener(lines: list, rng: np.random.Generator) -> list:
+    """Edit, remove, duplicate and add data lines of a screener (header kept)"""
+    header, rows = lines[0], lines[1:]
+    for i in rng.choice(len(rows), 40, replace=False):
+        rows[i] = rows[i].replace('.', '.9', 1)
+    removed = set(rng.choice(len(rows), 30, replace=False).tolist())
+    rows = [row for i, row in enumerate(rows) if i not in removed]
+    rows += [rows[i] for i in rng.choice(len(rows), 10, replace=False)]  # later duplicates win
+    rows += [f'New Instrument {i}' + row[row.index(','):] for i, row in enumerate(rows[:5])]
+    return [header] + rows
+
+
+def assert_same_screener(actual, expected, line_hashes=True):
+    """Compare (names, columns, line_hashes) triples, as returned by compile_screener"""
+    assert np.array_equal(actual[0], expected[0])
+    assert actual[1].keys() == expected[1].keys()
+    for field, column in actual[1].items():
+        assert column.dtype == expected[1][field].dtype, field
+        assert np.array_equal(column, expected[1][field], equal_nan=column.dtype.kind == 'f'), field
+    if line_hashes:
+        assert np.array_equal(actual[2], expected[2])
+
+
+def hashed_parse(csv_path: str, schema, batch_rows: int = 50_000):
+    """Full parse with line hashes: a reload from a cold build, which matches no rows"""
+    return compile_screener(csv_path, schema, load_columns(csv_path, schema), batch_rows=batch_rows)
+
+
+@pytest.mark.parametrize('filename, schema', SCREENERS)
+@pytest.mark.parametrize('batch_rows', [1_000, 50_000])
+def test_delta_reload_matches_full_parse(tmp_path, filename, schema, batch_rows):
+    with open(os.path.join(ASSETS_DIR, filename), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    csv_path = tmp_path / filename
+    csv_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    previous = load_columns(str(csv_path), schema, previous=load_columns(str(csv_path), schema))
+
+    csv_path.write_text('\n'.join(edit_screener(lines, np.random.default_rng(0))) + '\n', encoding='utf-8')
+    delta = compile_screener(str(csv_path), schema, previous, batch_rows=batch_rows)
+    cold = compile_screener(str(csv_path), schema, batch_rows=batch_rows)
+
+    assert not np.any(cold[2])
+    assert_same_screener(delta, cold, line_hashes=False)
+    assert_same_screener(delta, hashed_parse(str(csv_path), schema, batch_rows))
+
+
+def test_line_hashes_do_not_depend_on_batching(tmp_path):
+    with open(os.path.join(ASSETS_DIR, 'Stock_Screener.csv'), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    csv_path = tmp_path / 'Stock_Screener.csv'
+    csv_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    assert_same_screener(hashed_parse(str(csv_path), STOCK_SCHEMA, batch_rows=7),
+                         hashed_parse(str(csv_path), STOCK_SCHEMA))
+
+
+@pytest.mark.parametrize('filename, schema', SCREENERS)
+def test_cached_delta_reload_matches_full_parse(tmp_path, filename, schema):
+    with open(os.path.join(ASSETS_DIR, filename), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    csv_path = tmp_path / filename
+    csv_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    cache_dir = str(tmp_path / 'cache')
+    previous = load_columns(str(csv_path), schema, cache_dir=cache_dir)
+    assert not np.any(previous.line_hashes)
+
+    # The first reload after a cold build parses and hashes every line, the next one is a delta
+    for seed in (1, 2):
+        lines = edit_screener(lines, np.random.default_rng(seed))
+        csv_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        previous = load_columns(str(csv_path), schema, cache_dir=cache_dir, previous=previous)
+
+    assert_same_screener((previous.names, previous.columns, previous.line_hashes),
+                         hashed_parse(str(csv_path), schema))
@@ -0,0 +1,26 @@
+import pytest
+from src.engine.liquidity_engine import SmartLiquidityEngine
+from src.engine.snapshot import load_screener_snapshot
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SmartLiquidityEngine(load_screener_snapshot())
+
+
+def test_tax_is_reported_for_rounded_share_sales(engine):
+    result = engine.process_user_input({
+        'portfolio': {
+            'holdings_unit': 'quantity',
+            'stocks': {'a': {'Reliance Industries Ltd': 7}},
+            'bank_balances': {'a': 0},
+            'holding_details': {'a': {'Reliance Industries Ltd': {'cost_basis': 1000}}},
+        },
+        'questionnaire': {'purpose': 'other', 'amount_needed': 2000, 'tax_aware': True},
+    })
+    [sale] = result['primary_liquidation']['a']['Stock']
+    assert sale['quantity_to_sell'] == int(sale['quantity_to_sell'])
+    tax = result['tax']
+    assert tax['gross_proceeds'] == sale['value_to_sell']
+    assert tax['net_proceeds'] == pytest.approx(tax['gross_proceeds'] - tax['estimated_tax'], abs=0.01)
+    assert tax['net_proceeds'] >= 2000
@@ -0,0 +1,35 @@
+import pytest
+from src.utils.parser import UserDataParser
+
+
+def parse(portfolio=None, questionnaire=None):
+    return UserDataParser.parse_user_input({'portfolio': portfolio or {}, 'questionnaire': questionnaire or {}})[3]
+
+
+@pytest.mark.parametrize('answer, expected', [(True, True), (False, False), ('yes', True), ('no', False)])
+def test_tax_aware_accepts_booleans_and_yes_no(answer, expected):
+    assert parse(questionnaire={'tax_aware': answer})['tax_aware'] is expected
+
+
+@pytest.mark.parametrize('answer', ['false', 'true', '', 1, None])
+def test_tax_aware_rejects_other_values(answer):
+    with pytest.raises(ValueError):
+        parse(questionnaire={'tax_aware': answer})
+
+
+@pytest.mark.parametrize('details', [
+    {'a': {'X': {'cost_basis': None}}},
+    {'a': {'X': {'cost_basis': -1}}},
+    {'a': {'X': {'months_held': '12'}}},
+    {'a': {'X': {'months_held': True}}},
+    {'a': {'X': 5}},
+    {'a': []},
+])
+def test_invalid_holding_details_are_rejected(details):
+    with pytest.raises(ValueError):
+        parse(portfolio={'holding_details': details})
+
+
+def test_holding_details_fields_are_optional():
+    details = {'a': {'X': {'cost_basis': 1000, 'months_held': 14}, 'Y': {}, 'Z': None}}
+    assert parse(portfolio={'holding_details': details})['holding_details'] == details
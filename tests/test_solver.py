@@ -0,0 +1,44 @@
+import itertools
+import numpy as np
+import pytest
+from src.engine.solver import EXIT_PREMIUM, MIN_RETAINED_FRACTION, retention_weights, solve_liquidation
+
+
+def brute_force_cost(values: np.ndarray, scores: np.ndarray, amount: float) -> float:
+    """Cheapest plan by trying every set of fully exited holdings"""
+    weights = retention_weights(scores)
+    best = np.inf
+    for exited in itertools.product((False, True), repeat=len(values)):
+        exited = np.array(exited)
+        need = amount - values[exited].sum()
+        cost = (weights * values * (1 + EXIT_PREMIUM))[exited].sum()
+        # The rest are sold partially, cheapest retention weight first
+        for i in np.argsort(weights):
+            if need <= 0:
+                break
+            if not exited[i]:
+                sold = min(need, values[i] * (1 - MIN_RETAINED_FRACTION))
+                cost += sold * weights[i]
+                need -= sold
+        if need <= 1e-9:
+            best = min(best, cost)
+    return best
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_exact_solver_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 8))
+    values = rng.uniform(1_000, 100_000, n).round(2)
+    scores = rng.uniform(-20, 100, n)
+    amount = float(rng.uniform(0.05, 0.95) * values.sum())
+
+    plan = solve_liquidation(values, scores, amount, time_budget=10.0)
+
+    assert plan is not None and plan.optimal
+    assert plan.cost == pytest.approx(brute_force_cost(values, scores, amount), rel=1e-6)
+    assert plan.amounts.sum() >= amount - 1e-6
+    assert np.all(plan.amounts <= values + 1e-6)
+    # A holding is either exited or keeps at least the minimum residue
+    partial = plan.amounts < values - 1e-6
+    assert np.all(plan.amounts[partial] <= values[partial] * (1 - MIN_RETAINED_FRACTION) + 1e-6)